@@ -1,40 +1,81 @@
-from OpenSSL import crypto
+import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-def generate_self_signed_cert():
+CERT_FILE = Path("certs/server.crt")
+KEY_FILE = Path("certs/server.key")
+MIN_REMAINING_VALIDITY = timedelta(days=30)
+
+def existing_cert_is_valid() -> bool:
+    """Check whether a previously generated certificate can be reused"""
+    if not (CERT_FILE.exists() and KEY_FILE.exists()):
+        return False
+
+    # Only pay for the cryptography bindings once there is a certificate to parse
+    from cryptography import x509
+
+    try:
+        cert = x509.load_pem_x509_certificate(CERT_FILE.read_bytes())
+        # not_valid_after_utc needs cryptography 42+; older releases return naive UTC
+        try:
+            expires = cert.not_valid_after_utc
+        except AttributeError:
+            expires = cert.not_valid_after.replace(tzinfo=timezone.utc)
+        return expires - datetime.now(timezone.utc) > MIN_REMAINING_VALIDITY
+    except ValueError:
+        return False
+
+def generate_self_signed_cert(force: bool = False):
     """Generate self-signed certificate and private key"""
+    # Reuse the existing pair unless it is close to expiry
+    if not force and existing_cert_is_valid():
+        print(f"Reusing existing certificate: {CERT_FILE.absolute()}")
+        return
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
     # Create certificates directory if it doesn't exist
-    cert_dir = Path("certs")
+    cert_dir = CERT_FILE.parent
     cert_dir.mkdir(exist_ok=True)
-    
-    # Generate key
-    key = crypto.PKey()
-    key.generate_key(crypto.TYPE_RSA, 4096)
-    
+
+    # Generate key (ECDSA P-256 keygen is orders of magnitude faster than RSA-4096)
+    key = ec.generate_private_key(ec.SECP256R1())
+
     # Generate certificate
-    cert = crypto.X509()
-    cert.get_subject().CN = "localhost"
-    cert.get_subject().O = "Big Yellow Jacket"
-    cert.get_subject().OU = "Security System"
-    cert.get_subject().C = "US"
-    cert.set_serial_number(1000)
-    cert.gmtime_adj_notBefore(0)
-    cert.gmtime_adj_notAfter(365*24*60*60)  # Valid for one year
-    cert.set_issuer(cert.get_subject())
-    cert.set_pubkey(key)
-    cert.sign(key, 'sha256')
-    
+    subject = x509.Name([
+        x509.NameAttribute(NameOID.COMMON_NAME, "localhost"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Big Yellow Jacket"),
+        x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, "Security System"),
+        x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+    ])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(1000)
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=365))  # Valid for one year
+        .sign(key, hashes.SHA256())
+    )
+
     # Save certificate
-    with open("certs/server.crt", "wb") as f:
-        f.write(crypto.dump_certificate(crypto.FILETYPE_PEM, cert))
-    
+    CERT_FILE.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+
     # Save private key
-    with open("certs/server.key", "wb") as f:
-        f.write(crypto.dump_privatekey(crypto.FILETYPE_PEM, key))
-    
+    KEY_FILE.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+
     print("Certificate and private key generated successfully!")
-    print(f"Certificate saved to: {Path('certs/server.crt').absolute()}")
-    print(f"Private key saved to: {Path('certs/server.key').absolute()}")
+    print(f"Certificate saved to: {CERT_FILE.absolute()}")
+    print(f"Private key saved to: {KEY_FILE.absolute()}")
 
 if __name__ == "__main__":
-    generate_self_signed_cert()
+    generate_self_signed_cert(force='--force' in sys.argv)
\ No newline at end of file
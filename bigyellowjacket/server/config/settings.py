@@ -1,7 +1,8 @@
-from pathlib import Path
+import os
 from dataclasses import dataclass
+from typing import ClassVar
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ServerConfig:
     # Basic server settings
     HOST: str = "localhost"
@@ -25,7 +26,7 @@ class ServerConfig:
     API_VERSION: str = "v1"
     API_PREFIX: str = "/api"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MonitoringConfig:
     PACKET_CAPTURE: bool = True
     PROCESS_TRACKING: bool = True
@@ -43,7 +44,7 @@ class MonitoringConfig:
     THREAT_SCORE_THRESHOLD: float = 0.8
     ALERT_BATCH_SIZE: int = 100
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoggingConfig:
     LEVEL: str = "INFO"
     FILE: str = "logs/bigyellowjacket.log"
@@ -57,12 +58,12 @@ class LoggingConfig:
     ERROR_LOG: str = "logs/error.log"
     ACCESS_LOG: str = "logs/access.log"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecurityConfig:
     CERT_FILE: str = "certs/server.crt"
     KEY_FILE: str = "certs/server.key"
     BLOCKED_IPS_FILE: str = "data/blocked_ips.txt"
-    KNOWN_MALICIOUS_PORTS: set = None
+    KNOWN_MALICIOUS_PORTS: ClassVar[frozenset] = frozenset({23, 445, 135, 3389, 21, 1433})
     
     # Additional security settings
     SSL_PROTOCOL: str = "TLS"
@@ -81,18 +82,14 @@ class SecurityConfig:
     
     # Threat Intelligence
     THREAT_INTEL_UPDATE_INTERVAL: int = 3600  # 1 hour
-    THREAT_INTEL_SOURCES: list = None
+    THREAT_INTEL_SOURCES: ClassVar[tuple] = (
+        "data/threat_intel/database.json",
+        "data/threat_intel/malicious_ips.txt",
+        "data/threat_intel/threat_patterns.json"
+    )
     ALERT_THRESHOLD: int = 3
 
-    def __post_init__(self):
-        self.KNOWN_MALICIOUS_PORTS = {23, 445, 135, 3389, 21, 1433}
-        self.THREAT_INTEL_SOURCES = [
-            "data/threat_intel/database.json",
-            "data/threat_intel/malicious_ips.txt",
-            "data/threat_intel/threat_patterns.json"
-        ]
-
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExportConfig:
     # Export settings
     AUTO_EXPORT_INTERVAL: int = 3600  # 1 hour
@@ -101,24 +98,28 @@ class ExportConfig:
     COMPRESSION_TYPE: str = "gzip"
     
     # Export formats
-    AVAILABLE_FORMATS: list = None
+    AVAILABLE_FORMATS: ClassVar[tuple] = ("json", "csv", "yaml")
     DEFAULT_FORMAT: str = "json"
     
     # Export locations
     EXPORT_DIR: str = "data/exports"
     BACKUP_DIR: str = "data/exports/backup"
-    
-    def __post_init__(self):
-        self.AVAILABLE_FORMATS = ["json", "csv", "yaml"]
 
 class Config:
-    BASE_DIR = Path(__file__).parent.parent
+    # Kept as a string: os.path.join is much cheaper than Path.joinpath
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     SERVER = ServerConfig()
     MONITORING = MonitoringConfig()
     LOGGING = LoggingConfig()
     SECURITY = SecurityConfig()
     EXPORT = ExportConfig()
 
+    # Files that must exist when SSL is enabled, resolved once
+    REQUIRED_FILES = (
+        (SECURITY.CERT_FILE, os.path.join(BASE_DIR, SECURITY.CERT_FILE)),
+        (SECURITY.KEY_FILE, os.path.join(BASE_DIR, SECURITY.KEY_FILE)),
+    )
+
     @classmethod
     def create_directories(cls):
         directories = [
@@ -133,25 +134,26 @@ class Config:
             "certs",
             "data/stats"
         ]
-        for directory in directories:
-            Path(cls.BASE_DIR / directory).mkdir(parents=True, exist_ok=True)
+        # Only create leaf directories; makedirs creates shared parents once
+        base = cls.BASE_DIR
+        leaves = [
+            os.path.join(base, d) for d in directories
+            if not any(other.startswith(d + "/") for other in directories)
+        ]
+        for path in leaves:
+            os.makedirs(path, exist_ok=True)
 
     @classmethod
-    def get_path(cls, *paths) -> Path:
+    def get_path(cls, *paths) -> str:
         """Get full path relative to BASE_DIR"""
-        return cls.BASE_DIR.joinpath(*paths)
+        return os.path.join(cls.BASE_DIR, *paths)
 
     @classmethod
     def validate(cls):
         """Validate configuration settings"""
-        required_files = [
-            cls.SECURITY.CERT_FILE,
-            cls.SECURITY.KEY_FILE,
-        ]
-        
         missing_files = [
-            f for f in required_files 
-            if not cls.get_path(f).exists()
+            name for name, path in cls.REQUIRED_FILES
+            if not os.path.exists(path)
         ]
         
         if missing_files and cls.SERVER.SSL_ENABLED:
@@ -1,9 +1,29 @@
 from aiohttp import web
-import os
+from pathlib import Path
+import hashlib
+
+INDEX_FILE = Path(__file__).parent / 'websocket-test.html'
+
+# The index page is a small static asset, so read it once at import time
+INDEX_HTML = INDEX_FILE.read_bytes()
+INDEX_ETAG = f'"{hashlib.md5(INDEX_HTML).hexdigest()}"'
+INDEX_HEADERS = {
+    'Cache-Control': 'public, max-age=300',
+    'ETag': INDEX_ETAG
+}
+
+def etag_matches(header: str) -> bool:
+    """Weak comparison of an If-None-Match list against the index ETag"""
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == INDEX_ETAG:
+            return True
+    return False
 
 async def handle_index(request):
-    with open('websocket_test.html', 'rb') as f:
-        return web.Response(body=f.read(), content_type='text/html')
+    if etag_matches(request.headers.get('If-None-Match', '')):
+        return web.Response(status=304, headers=INDEX_HEADERS)
+    return web.Response(body=INDEX_HTML, content_type='text/html', headers=INDEX_HEADERS)
 
 app = web.Application()
 app.router.add_get('/', handle_index)
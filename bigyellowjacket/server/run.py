@@ -1,46 +1,61 @@
 import asyncio
+import os
 import sys
-import signal
 from pathlib import Path
 from src.utils.logger import logger
-from src.core.monitor import NetworkMonitor
-from src.core.console import ConsoleMonitor
-from src.core.websocket import WebSocketServer
-from config.settings import Config
+
+# Set by the signal handlers to request a graceful shutdown
+_SHUTDOWN = asyncio.Event()
 
 async def main():
     """Main application entry point"""
+    # Heavy modules (psutil, websockets, analyzers) are imported lazily so
+    # the banner shows up before their import cost is paid
+    import signal
+    from src.core.monitor import NetworkMonitor
+    from src.core.console import ConsoleMonitor
+    from src.core.websocket import WebSocketServer
+
     try:
         # Initialize components
         console_monitor = ConsoleMonitor(enable_console=True)
         network_monitor = NetworkMonitor(console_monitor)
         websocket_server = WebSocketServer(network_monitor, console_monitor)
         
-        # Start console updates
-        console_task = asyncio.create_task(console_monitor.start_updates())
-        
-        # Start network monitoring
-        monitor_task = asyncio.create_task(network_monitor.start_monitoring())
-        
-        # Start WebSocket server
-        websocket_task = asyncio.create_task(websocket_server.start())
-        
-        # Handle shutdown gracefully
-        def signal_handler(sig, frame):
-            logger.info("Shutdown signal received...")
-            console_monitor.stop_updates()
-            for task in [console_task, monitor_task, websocket_task]:
-                task.cancel()
-            
-        # Register signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        
-        # Wait for tasks
-        try:
-            await asyncio.gather(console_task, monitor_task, websocket_task)
-        except asyncio.CancelledError:
-            logger.info("Tasks cancelled, shutting down...")
+        # Register signal handlers on the event loop
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, _SHUTDOWN.set)
+            except NotImplementedError:
+                # Windows event loops do not support add_signal_handler
+                signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(_SHUTDOWN.set))
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                # Start console updates
+                tg.create_task(console_monitor.start_updates()),
+                # Start network monitoring
+                tg.create_task(network_monitor.start_monitoring()),
+                # Start WebSocket server
+                tg.create_task(websocket_server.start())
+            ]
+
+            # Wait for a shutdown signal, or for every task to finish on its own
+            finished = tg.create_task(asyncio.wait(tasks))
+            shutdown = tg.create_task(_SHUTDOWN.wait())
+            await asyncio.wait({finished, shutdown}, return_when=asyncio.FIRST_COMPLETED)
+            finished.cancel()
+            shutdown.cancel()
+
+            if _SHUTDOWN.is_set():
+                # Cancel the running tasks
+                logger.info("Shutdown signal received...")
+                console_monitor.stop_updates()
+                for task in tasks:
+                    task.cancel()
+
+        logger.info("Tasks cancelled, shutting down...")
         
     except Exception as e:
         logger.error(f"Application error: {e}")
@@ -50,20 +65,31 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        # Ensure required directories exist
-        for dir_name in ['logs', 'data', 'certs']:
-            Path(dir_name).mkdir(exist_ok=True)
+        # Ensure required directories exist (skipped once a previous run created them)
+        sentinel = Path('certs/.initialized')
+        if not sentinel.exists():
+            for dir_name in ['logs', 'data', 'certs']:
+                Path(dir_name).mkdir(exist_ok=True)
+            sentinel.touch()
         
-        # Print startup banner
-        print("""
+        # Print startup banner unless BYJ_QUIET is set
+        if not os.environ.get('BYJ_QUIET'):
+            print("""
 [Big Yellow Jacket Security
 by Donnie Bugden V 1.0
 https://bigyellowjacket.com
 ]
-        """)
+            """)
         
-        # Run the application
-        asyncio.run(main())
+        # Run the application on uvloop when it is available (not on Windows)
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            loop_factory = None
+
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(main())
         
     except KeyboardInterrupt:
         logger.info("Application terminated by user")
@@ -1,5 +1 @@
-class ServerConfig:
-    HOST: str = "0.0.0.0"  # Changed from localhost to allow external connections
-    PORT: int = 8765
-    DEBUG: bool = True
-    SSL_ENABLED: bool = False  # Set to False for initial testing
\ No newline at end of file
+from config.settings import ServerConfig  # Canonical definition lives in config/settings.py
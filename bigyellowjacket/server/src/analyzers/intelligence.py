@@ -1,47 +1,113 @@
 import asyncio
+import bisect
+import csv
+import io
 import socket
-import subprocess
-import platform
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
-from typing import Dict, Optional, List, Set
+from operator import attrgetter
+from statistics import fmean
+from typing import Dict, Optional, List, Tuple
 import ipaddress
 from pathlib import Path
+from types import MappingProxyType
+from array import array
 import json
-import re
 import math
 import psutil
 from src.utils.logger import logger
 from src.models.datatypes import NetworkEndpoint, ProcessInfo, TrafficSample, SecurityAssessment
 
+# orjson is an optional, much faster encoder for endpoint exports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Read-only lookup tables shared by every gatherer (process names are case-folded)
+KNOWN_SAFE_PROCESSES = frozenset(name.lower() for name in (
+    'chrome.exe', 'firefox.exe', 'safari',
+    'outlook.exe', 'thunderbird', 'code',
+    'python', 'node', 'nginx', 'apache2'
+))
+
+RECOMMENDATIONS = MappingProxyType({
+    "CRITICAL": "Immediate action required: Block this connection and investigate",
+    "HIGH": "Recommended action: Monitor closely and consider blocking",
+    "MEDIUM": "Caution advised: Monitor for suspicious behavior",
+    "LOW": "Normal monitoring recommended",
+    "UNKNOWN": "Unable to determine risk level - manual investigation recommended"
+})
+
 class NetworkIntelligenceGatherer:
     """Gathers intelligence about network endpoints and performs security analysis"""
     
+    # Endpoint attributes filled in by a gathering run
+    INTELLIGENCE_FIELDS = (
+        'reverse_dns', 'is_private', 'open_ports', 'latency', 'packet_loss',
+        'rtt_stats', 'process_info', 'country', 'city', 'organization',
+        'traffic_samples', 'encryption_type', 'bytes_sent', 'bytes_received',
+        'avg_packet_size', 'security_assessment', 'is_safe'
+    )
+    
     def __init__(self, console_monitor):
         # System and monitoring setup
-        self.system = platform.system().lower()
         self.console = console_monitor
         self.connection_history: Dict[str, Dict] = {}
         
         # Caching mechanisms
-        self.dns_cache: Dict[str, Dict] = {}
-        self.location_cache: Dict[str, Dict] = {}
-        self.process_cache: Dict[int, ProcessInfo] = {}
+        self.dns_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.location_cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self.process_cache: Dict[int, Tuple[psutil.Process, ProcessInfo, float]] = {}
         self.dns_cache_timeout = 3600  # 1 hour
+        self.dns_negative_cache_timeout = 300  # 5 minutes for hosts without a PTR record
+        # Lookups in flight, shared by concurrent requests for the same host
+        self.pending_dns: Dict[str, asyncio.Future] = {}
+        
+        # Blocking resolver calls run on their own bounded pool
+        self.dns_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='dns')
+        self.process_cache_timeout = 5.0  # seconds
+        self.location_cache_timeout = 24 * 3600  # 24 hours
+        
+        # Remote (ip, port) -> pid index shared by concurrent process lookups,
+        # plus the (local port, remote port) TCP pairs seen for each remote ip
+        self.connection_index: Dict[Tuple[str, int], int] = {}
+        self.host_connections: Dict[str, List[Tuple[int, int]]] = {}
+        self.connection_index_time = 0.0
+        self.connection_index_ttl = 1.0  # second
+        self.connection_index_lock = asyncio.Lock()
+        
+        # Concurrent requests for the same (host, port) share a single run
+        self.inflight_intelligence: Dict[Tuple[str, int], asyncio.Future] = {}
         
         # Load threat intelligence database
         self.threat_intel_db = self.load_threat_intel()
-        self.known_safe_processes: Set[str] = {
-            'chrome.exe', 'firefox.exe', 'safari',
-            'outlook.exe', 'thunderbird', 'code',
-            'python', 'node', 'nginx', 'apache2'
-        }
+        self.malicious_ips = frozenset(self.threat_intel_db['malicious_ips'])
+        self.malicious_range_starts, self.malicious_range_ends = self.build_ip_ranges(
+            self.threat_intel_db['malicious_ips']
+        )
         
         # Analysis configuration
         self.packet_capture_timeout = 5  # seconds
         self.max_port_scan_timeout = 1  # second
+        self.intelligence_timeout = 6.0  # seconds
+        self.max_probe_concurrency = 500
+        self.probe_semaphore = asyncio.Semaphore(self.max_probe_concurrency)
         self.max_cached_entries = 1000
         self.suspicious_ports = {23, 445, 135, 3389}
         
+        # Sorted, merged integer bounds of every non-public IPv4 range
+        # (private, loopback, link-local, reserved and multicast)
+        self.private_range_starts, self.private_range_ends = self.build_ip_ranges([
+            '0.0.0.0/8', '10.0.0.0/8', '127.0.0.0/8', '169.254.0.0/16',
+            '172.16.0.0/12', '192.0.0.0/29', '192.0.0.170/31', '192.0.2.0/24',
+            '192.168.0.0/16', '198.18.0.0/15', '198.51.100.0/24', '203.0.113.0/24',
+            '224.0.0.0/4', '240.0.0.0/4', '255.255.255.255/32'
+        ])
+        
     def load_threat_intel(self) -> Dict:
         """Load threat intelligence data from local database"""
         try:
@@ -58,30 +124,30 @@ class NetworkIntelligenceGatherer:
                 'known_threats': {}
             }
             
+            # Both decoders accept the raw file bytes
+            load_json = orjson.loads if orjson is not None else json.loads
+            
             # Load main database
             if intel_paths['main'].exists():
-                with open(intel_paths['main']) as f:
-                    main_data = json.load(f)
-                    if 'malicious_ips' in main_data:
-                        threat_data['malicious_ips'] = set(main_data['malicious_ips'])
-                    for key in ['threat_patterns', 'risk_scores', 'known_threats']:
-                        if key in main_data:
-                            threat_data[key] = main_data[key]
+                main_data = load_json(intel_paths['main'].read_bytes())
+                if 'malicious_ips' in main_data:
+                    threat_data['malicious_ips'] = set(main_data['malicious_ips'])
+                for key in ['threat_patterns', 'risk_scores', 'known_threats']:
+                    if key in main_data:
+                        threat_data[key] = main_data[key]
             
             # Load IP lists
             if intel_paths['ip_lists'].exists():
-                with open(intel_paths['ip_lists']) as f:
-                    malicious_ips = {
-                        line.strip() for line in f 
-                        if line.strip() and not line.startswith('#')
-                    }
-                    threat_data['malicious_ips'].update(malicious_ips)
+                # Read the whole feed at once and strip each line a single time
+                lines = intel_paths['ip_lists'].read_text().splitlines()
+                threat_data['malicious_ips'].update(
+                    ip for ip in map(str.strip, lines)
+                    if ip and not ip.startswith('#')
+                )
             
             # Load threat patterns
             if intel_paths['patterns'].exists():
-                with open(intel_paths['patterns']) as f:
-                    patterns = json.load(f)
-                    threat_data['threat_patterns'] = patterns
+                threat_data['threat_patterns'] = load_json(intel_paths['patterns'].read_bytes())
             
             logger.info(f"Loaded threat intelligence data: "
                        f"{len(threat_data['malicious_ips'])} IPs, "
@@ -98,22 +164,40 @@ class NetworkIntelligenceGatherer:
                 'known_threats': {}
             }
     
+    def build_ip_ranges(self, entries) -> Tuple[array, array]:
+        """Build sorted, merged IPv4 ranges from addresses and CIDR blocks"""
+        ranges = []
+        for entry in entries:
+            try:
+                network = ipaddress.IPv4Network(entry, strict=False)
+            except ValueError:
+                # IPv6 and malformed entries are only matched exactly
+                continue
+            ranges.append((int(network.network_address), int(network.broadcast_address)))
+        
+        ranges.sort()
+        starts, ends = array('I'), array('I')
+        for start, end in ranges:
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+    
+    def is_malicious_ip(self, host: str) -> bool:
+        """Check a host against known malicious addresses and ranges"""
+        if host in self.malicious_ips:
+            return True
+        try:
+            ip_int = int(ipaddress.IPv4Address(host))
+        except ValueError:
+            return False
+        index = bisect.bisect_right(self.malicious_range_starts, ip_int) - 1
+        return index >= 0 and ip_int <= self.malicious_range_ends[index]
+
     def cleanup_caches(self):
         """Clean up expired cache entries"""
-        current_time = datetime.now().timestamp()
-        
-        # Clean DNS cache
-        expired_dns = [
-            ip for ip, data in self.dns_cache.items()
-            if current_time - data.get('timestamp', 0) > self.dns_cache_timeout
-        ]
-        for ip in expired_dns:
-            del self.dns_cache[ip]
-            
-        # Clean location cache if too large
-        if len(self.location_cache) > self.max_cached_entries:
-            self.location_cache.clear()
-            
         # Clean process cache
         expired_processes = [
             pid for pid in self.process_cache
@@ -125,38 +209,81 @@ class NetworkIntelligenceGatherer:
     def is_private_ip(self, ip: str) -> bool:
         """Check if IP address is private"""
         try:
-            ip_obj = ipaddress.ip_address(ip)
-            return any([
-                ip_obj.is_private,
-                ip_obj.is_loopback,
-                ip_obj.is_link_local,
-                ip_obj.is_multicast,
-                str(ip_obj).startswith('169.254.'),  # Link local
-                str(ip_obj).startswith('127.'),      # Loopback
-                str(ip_obj).startswith('0.'),        # Invalid
-                str(ip_obj).startswith('224.'),      # Multicast
-            ])
-        except ValueError:
-            logger.error(f"Invalid IP address: {ip}")
-            return False
+            # Packing with inet_pton avoids building an IPv4Address per check
+            ip_int = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+        except (OSError, TypeError):
+            # Not IPv4, fall back to the ipaddress flags
+            try:
+                ip_obj = ipaddress.ip_address(ip)
+            except ValueError:
+                logger.error(f"Invalid IP address: {ip}")
+                return False
+            return (ip_obj.is_private or ip_obj.is_loopback or
+                    ip_obj.is_link_local or ip_obj.is_multicast)
+        
+        index = bisect.bisect_right(self.private_range_starts, ip_int) - 1
+        return index >= 0 and ip_int <= self.private_range_ends[index]
 
     async def gather_intelligence(self, endpoint: NetworkEndpoint) -> NetworkEndpoint:
         """Gather comprehensive intelligence about an endpoint"""
+        key = (endpoint.host, endpoint.port)
+        inflight = self.inflight_intelligence.get(key)
+        if inflight is not None:
+            # Another caller is already gathering this endpoint; reuse its results
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The owning run failed, so gather this endpoint ourselves
+                return await self.run_intelligence(endpoint)
+            if result is not endpoint:
+                self.copy_intelligence(result, endpoint)
+            return endpoint
+        
+        future = asyncio.get_running_loop().create_future()
+        self.inflight_intelligence[key] = future
+        try:
+            result = await self.run_intelligence(endpoint)
+        except BaseException:
+            # Waiters must not copy intelligence that was never gathered
+            future.cancel()
+            raise
+        finally:
+            del self.inflight_intelligence[key]
+        future.set_result(result)
+        return result
+
+    def copy_intelligence(self, source: NetworkEndpoint, target: NetworkEndpoint):
+        """Copy gathered intelligence from one endpoint onto another"""
+        for name in self.INTELLIGENCE_FIELDS:
+            setattr(target, name, getattr(source, name))
+
+    async def run_intelligence(self, endpoint: NetworkEndpoint) -> NetworkEndpoint:
+        """Run every intelligence task for an endpoint and assess the result"""
         try:
             # Run intelligence gathering tasks concurrently
-            dns_task = asyncio.create_task(self.get_dns_info(endpoint.host))
-            ports_task = asyncio.create_task(self.scan_ports(endpoint.host))
-            latency_task = asyncio.create_task(self.measure_latency(endpoint.host))
-            traffic_task = asyncio.create_task(self.capture_traffic(endpoint))
-            process_task = asyncio.create_task(self.get_process_info(endpoint))
-            location_task = asyncio.create_task(self.get_location_info(endpoint.host))
-            
-            # Await all tasks
-            results = await asyncio.gather(
-                dns_task, ports_task, latency_task, 
-                traffic_task, process_task, location_task,
-                return_exceptions=True
-            )
+            tasks = [
+                asyncio.create_task(self.get_dns_info(endpoint.host)),
+                asyncio.create_task(self.scan_ports(endpoint.host)),
+                asyncio.create_task(self.measure_latency(endpoint.host, endpoint.port)),
+                asyncio.create_task(self.capture_traffic(endpoint)),
+                asyncio.create_task(self.get_process_info(endpoint)),
+                asyncio.create_task(self.get_location_info(endpoint.host))
+            ]
+            
+            # Bound the whole run; stragglers are cancelled rather than awaited
+            done, pending = await asyncio.wait(tasks, timeout=self.intelligence_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.debug(f"{len(pending)} intelligence tasks timed out for {endpoint.host}")
+            
+            # Failed or cancelled tasks yield None and are skipped by update_endpoint_info
+            results = [
+                task.result() if task in done and task.exception() is None else None
+                for task in tasks
+            ]
             
             # Unpack results
             dns_info, open_ports, latency_info, traffic_info, process_info, location_info = results
@@ -229,34 +356,72 @@ class NetworkIntelligenceGatherer:
 
     async def get_dns_info(self, host: str) -> Dict:
         """Get DNS information about a host"""
-        if host in self.dns_cache:
-            cache_entry = self.dns_cache[host]
-            if datetime.now().timestamp() - cache_entry['timestamp'] < self.dns_cache_timeout:
+        cache_entry = self.dns_cache.get(host)
+        if cache_entry:
+            if cache_entry['expires'] > time.monotonic():
+                self.dns_cache.move_to_end(host)
                 return cache_entry['data']
-        
+            # Expired entries are dropped on read; the LRU bound evicts the rest
+            del self.dns_cache[host]
+            
+        pending = self.pending_dns.get(host)
+        if pending is not None:
+            return await asyncio.shield(pending)
+            
+        future = asyncio.get_running_loop().create_future()
+        self.pending_dns[host] = future
+        try:
+            info = await self.resolve_dns(host)
+            future.set_result(info)
+            return info
+        finally:
+            del self.pending_dns[host]
+            if not future.done():
+                future.set_result({'hostname': None, 'addresses': [host], 'ttl': 0})
+
+    async def resolve_dns(self, host: str) -> Dict:
+        """Resolve a host and cache the result"""
         try:
-            # Use socket for forward and reverse DNS
-            loop = asyncio.get_event_loop()
+            # Run forward and reverse lookups concurrently on the DNS pool
+            loop = asyncio.get_running_loop()
+            forward, reverse = await asyncio.gather(
+                loop.run_in_executor(
+                    self.dns_executor, socket.getaddrinfo, host, None, 0, socket.SOCK_STREAM
+                ),
+                loop.run_in_executor(self.dns_executor, socket.gethostbyaddr, host),
+                return_exceptions=True
+            )
             
-            # Forward lookup
-            try:
-                addresses = await loop.run_in_executor(None, socket.gethostbyname_ex, host)
-                hostname = await loop.run_in_executor(None, socket.gethostbyaddr, host)
-            except (socket.gaierror, socket.herror):
-                addresses = (None, None, [host])
-                hostname = (None, None, None)
+            if isinstance(forward, OSError):
+                addresses = [host]
+            elif isinstance(forward, BaseException):
+                raise forward
+            else:
+                addresses = list(dict.fromkeys(addr[4][0] for addr in forward)) or [host]
+                
+            if isinstance(reverse, OSError):
+                hostname = None
+            elif isinstance(reverse, BaseException):
+                raise reverse
+            else:
+                hostname = reverse[0] or None
 
+            # The resolver does not expose record TTLs, so misses expire sooner
+            ttl = self.dns_cache_timeout if hostname else self.dns_negative_cache_timeout
             info = {
-                'hostname': hostname[0] if hostname[0] else None,
-                'addresses': addresses[2] if addresses[2] else [host],
-                'ttl': 0
+                'hostname': hostname,
+                'addresses': addresses,
+                'ttl': ttl
             }
             
-            # Cache the result
+            # Cache the result, evicting the least recently used host
             self.dns_cache[host] = {
-                'timestamp': datetime.now().timestamp(),
+                'expires': time.monotonic() + ttl,
                 'data': info
             }
+            self.dns_cache.move_to_end(host)
+            if len(self.dns_cache) > self.max_cached_entries:
+                self.dns_cache.popitem(last=False)
             
             return info
             
@@ -267,55 +432,101 @@ class NetworkIntelligenceGatherer:
     async def get_process_info(self, endpoint: NetworkEndpoint) -> Optional[ProcessInfo]:
         """Get information about the process using this connection"""
         try:
-            # Check process cache first
-            if hasattr(endpoint, 'pid') and endpoint.pid in self.process_cache:
-                return self.process_cache[endpoint.pid]
-
-            # Get all network connections
-            loop = asyncio.get_event_loop()
-            connections = await loop.run_in_executor(None, psutil.net_connections)
-            
-            for conn in connections:
-                try:
-                    if (conn.raddr and 
-                        conn.raddr[0] == endpoint.host and 
-                        conn.raddr[1] == endpoint.port):
-                        
-                        process = psutil.Process(conn.pid)
-                        
-                        # Create process info
-                        process_info = ProcessInfo(
-                            pid=conn.pid,
-                            name=process.name(),
-                            path=process.exe(),
-                            command_line=' '.join(process.cmdline()),
-                            username=process.username(),
-                            creation_time=datetime.fromtimestamp(process.create_time()),
-                            cpu_percent=process.cpu_percent(),
-                            memory_percent=process.memory_percent(),
-                            status=process.status()
-                        )
-                        
-                        # Cache the process info
-                        self.process_cache[conn.pid] = process_info
-                        return process_info
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-                except Exception as e:
-                    logger.debug(f"Error getting process info: {e}")
-                    continue
+            # Look up the owning process in the shared connection index
+            connection_index = await self.get_connection_index()
+            pid = connection_index.get((endpoint.host, endpoint.port))
+            if pid is None:
+                return None
+                
+            # Reuse the cached snapshot while it is fresh
+            cached = self.process_cache.get(pid)
+            if cached and time.monotonic() - cached[2] < self.process_cache_timeout:
+                return cached[1]
+                
+            try:
+                # Keep the psutil handle so cpu_percent() deltas stay meaningful
+                if cached and cached[0].is_running():
+                    process, previous = cached[0], cached[1]
+                else:
+                    process, previous = psutil.Process(pid), None
+                
+                if previous:
+                    # Path, command line, owner and start time never change for a
+                    # running process, so a refresh only re-reads the volatile fields
+                    info = process.as_dict(attrs=['cpu_percent', 'memory_percent', 'status'])
+                    process_info = replace(
+                        previous,
+                        cpu_percent=info['cpu_percent'] or 0,
+                        memory_percent=info['memory_percent'] or 0,
+                        status=info['status']
+                    )
+                else:
+                    # Fetch every attribute in one pass
+                    info = process.as_dict(attrs=[
+                        'name', 'exe', 'cmdline', 'username', 'create_time',
+                        'cpu_percent', 'memory_percent', 'status'
+                    ])
                     
-            return None
+                    # Create process info
+                    process_info = ProcessInfo(
+                        pid=pid,
+                        name=info['name'],
+                        path=info['exe'],
+                        command_line=' '.join(info['cmdline'] or []),
+                        username=info['username'],
+                        creation_time=datetime.fromtimestamp(info['create_time']) if info['create_time'] else None,
+                        cpu_percent=info['cpu_percent'] or 0,
+                        memory_percent=info['memory_percent'] or 0,
+                        status=info['status']
+                    )
+                
+                # Cache the process handle and info
+                self.process_cache[pid] = (process, process_info, time.monotonic())
+                return process_info
+                
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                return None
             
         except Exception as e:
             logger.error(f"Error getting process info for {endpoint.host}: {e}")
             return None
 
+    async def get_connection_index(self) -> Dict[Tuple[str, int], int]:
+        """Get the (remote ip, remote port) -> pid index, refreshing it when stale"""
+        async with self.connection_index_lock:
+            if time.monotonic() - self.connection_index_time > self.connection_index_ttl:
+                loop = asyncio.get_running_loop()
+                connections = await loop.run_in_executor(None, psutil.net_connections, 'inet')
+                connection_index = {}
+                host_connections = {}
+                for conn in connections:
+                    if not conn.raddr:
+                        continue
+                    if conn.pid:
+                        connection_index[(conn.raddr.ip, conn.raddr.port)] = conn.pid
+                    if conn.type == socket.SOCK_STREAM:
+                        host_connections.setdefault(conn.raddr.ip, []).append(
+                            (conn.laddr.port, conn.raddr.port)
+                        )
+                self.connection_index = connection_index
+                self.host_connections = host_connections
+                self.connection_index_time = time.monotonic()
+        return self.connection_index
+
     async def get_location_info(self, host: str) -> Dict:
         """Get geographical location information for an IP"""
-        if host in self.location_cache:
-            return self.location_cache[host]
+        # Private addresses have no geolocation to look up
+        if self.is_private_ip(host):
+            return {
+                'country': 'PRIVATE',
+                'city': 'PRIVATE',
+                'org': 'PRIVATE'
+            }
+            
+        cached = self.location_cache.get(host)
+        if cached and cached[1] > time.monotonic():
+            self.location_cache.move_to_end(host)
+            return cached[0]
             
         try:
             # This is a placeholder - implement actual IP geolocation
@@ -325,7 +536,11 @@ class NetworkIntelligenceGatherer:
                 'org': 'Unknown'
             }
             
-            self.location_cache[host] = info
+            # Evict only the least recently used entry when full
+            self.location_cache[host] = (info, time.monotonic() + self.location_cache_timeout)
+            self.location_cache.move_to_end(host)
+            if len(self.location_cache) > self.max_cached_entries:
+                self.location_cache.popitem(last=False)
             return info
             
         except Exception as e:
@@ -336,58 +551,19 @@ class NetworkIntelligenceGatherer:
                 'org': 'Unknown'
             }
 
-    async def measure_latency(self, host: str) -> Dict:
-        """Measure network latency to the host with improved timeout handling"""
+    async def measure_latency(self, host: str, port: int = 443) -> Dict:
+        """Measure network latency to the host by timing TCP connects"""
         try:
-            # Reduced ping count and timeout for faster measurements
-            if self.system == "windows":
-                cmd = f"ping -n 2 -w 1000 {host}"  # 2 pings, 1 second timeout
-                parse_loss = r"(\d+)% loss"
-                parse_time = r"time[=<](\d+)ms"
-            else:
-                cmd = f"ping -c 2 -W 1 {host}"  # 2 pings, 1 second timeout
-                parse_loss = r"(\d+)% packet loss"
-                parse_time = r"time=(\d+\.\d+) ms"
-            
-            # Execute ping command with timeout
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            # A few concurrent connect probes instead of spawning ping;
+            # a single probe is enough for hosts on the local network
+            probes = 1 if self.is_private_ip(host) else 3
+            results = await asyncio.gather(
+                *(self.tcp_ping(host, port) for _ in range(probes))
             )
+            times = [rtt for rtt in results if rtt is not None]
             
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=2.0)
-                output = stdout.decode()
-                
-                # Parse results
-                loss_match = re.search(parse_loss, output)
-                time_matches = re.findall(parse_time, output)
-                
-                packet_loss = float(loss_match.group(1)) if loss_match else 100
-                times = [float(t) for t in time_matches] if time_matches else []
-                
-                if not times:
-                    # If no successful pings, return high latency values
-                    return {
-                        "packet_loss": 100,
-                        "min_rtt": 1000,
-                        "max_rtt": 1000,
-                        "avg_rtt": 1000,
-                        "samples": 0,
-                        "status": "timeout"
-                    }
-                
-                return {
-                    "packet_loss": packet_loss,
-                    "min_rtt": min(times) if times else 1000,
-                    "max_rtt": max(times) if times else 1000,
-                    "avg_rtt": sum(times) / len(times) if times else 1000,
-                    "samples": len(times),
-                    "status": "success"
-                }
-            except asyncio.TimeoutError:
-                # Handle timeout more gracefully
+            if not times:
+                # If no successful probes, return high latency values
                 logger.debug(f"Latency measurement timeout for {host}")
                 return {
                     "packet_loss": 100,
@@ -397,6 +573,15 @@ class NetworkIntelligenceGatherer:
                     "samples": 0,
                     "status": "timeout"
                 }
+            
+            return {
+                "packet_loss": (probes - len(times)) / probes * 100,
+                "min_rtt": min(times),
+                "max_rtt": max(times),
+                "avg_rtt": sum(times) / len(times),
+                "samples": len(times),
+                "status": "success"
+            }
                 
         except Exception as e:
             logger.debug(f"Error measuring latency to {host}: {str(e)}")
@@ -410,32 +595,41 @@ class NetworkIntelligenceGatherer:
                 "error": str(e)
             }
 
+    async def connect_probe(self, host: str, port: int, timeout: float) -> bool:
+        """Attempt a bare TCP connect to host:port, returning True if it succeeds"""
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        # A shared semaphore caps open probe sockets across all endpoints
+        async with self.probe_semaphore:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.setblocking(False)
+                await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout=timeout)
+                return True
+            except (OSError, asyncio.TimeoutError):
+                return False
+            finally:
+                sock.close()
+
+    async def tcp_ping(self, host: str, port: int, timeout: float = 1.0) -> Optional[float]:
+        """Time a TCP connect to host:port, returning the RTT in ms or None on failure"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        if not await self.connect_probe(host, port, timeout):
+            return None
+        return (loop.time() - start) * 1000
+
     async def scan_ports(self, host: str) -> List[int]:
         """Scan common ports on the host"""
-        open_ports = []
         common_ports = [20, 21, 22, 23, 25, 53, 80, 443, 3389, 5900]
         
         try:
-            async def check_port(port):
-                try:
-                    future = asyncio.open_connection(host, port)
-                    reader, writer = await asyncio.wait_for(
-                        future, timeout=self.max_port_scan_timeout
-                    )
-                    writer.close()
-                    await writer.wait_closed()
-                    return port
-                except:
-                    return None
-            
             # Scan ports concurrently
-            tasks = [check_port(port) for port in common_ports]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Filter successful results
-            open_ports = [port for port in results if isinstance(port, int) and port is not None]
-            
-            return open_ports
+            results = await asyncio.gather(*(
+                self.connect_probe(host, port, self.max_port_scan_timeout)
+                for port in common_ports
+            ))
+            return [port for port, is_open in zip(common_ports, results) if is_open]
             
         except Exception as e:
             logger.error(f"Error scanning ports for {host}: {e}")
@@ -444,133 +638,32 @@ class NetworkIntelligenceGatherer:
     async def capture_traffic(self, endpoint: NetworkEndpoint) -> Dict:
         """Capture and analyze traffic for the endpoint"""
         try:
-            # For Windows, use netstat instead of packet capture
-            if self.system == "windows":
-                return await self.get_connection_info_windows(endpoint)
-            else:
-                return await self.get_connection_info_linux(endpoint)
-        except Exception as e:
-            logger.error(f"Error capturing traffic: {e}")
-            return {
-                'samples': [],
-                'encryption_type': 'UNKNOWN',
-                'bytes_sent': 0,
-                'bytes_received': 0
-            }
-
-    async def get_connection_info_windows(self, endpoint: NetworkEndpoint) -> Dict:
-        """Get connection information using netstat on Windows"""
-        try:
-            cmd = f"netstat -n -p TCP | findstr {endpoint.host}"
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            # TCP connections to this host come from the shared psutil snapshot
+            await self.get_connection_index()
+            timestamp = datetime.now()
+            is_encrypted = endpoint.port == 443
+            samples = [
+                TrafficSample(
+                    timestamp=timestamp,
+                    source_port=source_port,
+                    destination_port=dest_port,
+                    protocol='TCP',
+                    payload_size=0,
+                    is_encrypted=is_encrypted,
+                    packet_type='TCP'
+                )
+                for source_port, dest_port in self.host_connections.get(endpoint.host, ())
+            ]
             
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=5.0)
-                connections = stdout.decode().splitlines()
-                samples = []
-                bytes_sent = 0
-                bytes_received = 0
-                
-                for conn in connections:
-                    parts = conn.split()
-                    if len(parts) >= 4:
-                        try:
-                            source_port = int(parts[1].split(':')[-1])
-                            dest_port = int(parts[2].split(':')[-1])
-                            samples.append(TrafficSample(
-                                timestamp=datetime.now(),
-                                source_port=source_port,
-                                destination_port=dest_port,
-                                protocol='TCP',
-                                payload_size=0,
-                                is_encrypted=endpoint.port == 443,
-                                packet_type='TCP'
-                            ))
-                        except (ValueError, IndexError) as e:
-                            continue
-                
-                return {
-                    'samples': samples,
-                    'encryption_type': 'SSL/TLS' if endpoint.port == 443 else 'NONE',
-                    'bytes_sent': bytes_sent,
-                    'bytes_received': bytes_received
-                }
-                
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout getting Windows connection info for {endpoint.host}")
-                return {
-                    'samples': [],
-                    'encryption_type': 'UNKNOWN',
-                    'bytes_sent': 0,
-                    'bytes_received': 0
-                }
-                
-        except Exception as e:
-            logger.error(f"Error getting Windows connection info: {str(e)}")
             return {
-                'samples': [],
-                'encryption_type': 'UNKNOWN',
+                'samples': samples,
+                'encryption_type': 'SSL/TLS' if is_encrypted else 'NONE',
                 'bytes_sent': 0,
                 'bytes_received': 0
             }
-
-    async def get_connection_info_linux(self, endpoint: NetworkEndpoint) -> Dict:
-        """Get connection information using ss on Linux"""
-        try:
-            cmd = f"ss -tn dst {endpoint.host}"
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
             
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=5.0)
-                connections = stdout.decode().splitlines()[1:]  # Skip header
-                samples = []
-                bytes_sent = 0
-                bytes_received = 0
-                
-                for conn in connections:
-                    parts = conn.split()
-                    if len(parts) >= 4:
-                        try:
-                            source_port = int(parts[2].split(':')[-1])
-                            dest_port = int(parts[3].split(':')[-1])
-                            samples.append(TrafficSample(
-                                timestamp=datetime.now(),
-                                source_port=source_port,
-                                destination_port=dest_port,
-                                protocol='TCP',
-                                payload_size=0,
-                                is_encrypted=endpoint.port == 443,
-                                packet_type='TCP'
-                            ))
-                        except (ValueError, IndexError):
-                            continue
-                
-                return {
-                    'samples': samples,
-                    'encryption_type': 'SSL/TLS' if endpoint.port == 443 else 'NONE',
-                    'bytes_sent': bytes_sent,
-                    'bytes_received': bytes_received
-                }
-                
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout getting Linux connection info for {endpoint.host}")
-                return {
-                    'samples': [],
-                    'encryption_type': 'UNKNOWN',
-                    'bytes_sent': 0,
-                    'bytes_received': 0
-                }
-                
         except Exception as e:
-            logger.error(f"Error getting Linux connection info: {str(e)}")
+            logger.error(f"Error capturing traffic: {e}")
             return {
                 'samples': [],
                 'encryption_type': 'UNKNOWN',
@@ -582,7 +675,7 @@ class NetworkIntelligenceGatherer:
         """Calculate average packet size from samples"""
         if not samples:
             return 0.0
-        return sum(sample.payload_size for sample in samples) / len(samples)
+        return fmean(map(attrgetter('payload_size'), samples))
 
     async def assess_security(self, endpoint: NetworkEndpoint) -> SecurityAssessment:
         """Assess security risks for an endpoint"""
@@ -591,7 +684,7 @@ class NetworkIntelligenceGatherer:
         
         try:
             # Check known malicious indicators
-            if str(endpoint.host) in self.threat_intel_db.get('malicious_ips', set()):
+            if self.is_malicious_ip(endpoint.host):
                 threat_indicators.append(f"IP {endpoint.host} is known malicious")
                 
             if endpoint.port in self.suspicious_ports:
@@ -599,14 +692,13 @@ class NetworkIntelligenceGatherer:
                 
             # Check traffic patterns
             if endpoint.traffic_samples:
-                encrypted_ratio = sum(1 for s in endpoint.traffic_samples if s.is_encrypted)
-                if encrypted_ratio and len(endpoint.traffic_samples) > 0:
-                    if encrypted_ratio / len(endpoint.traffic_samples) > 0.9:
-                        risk_factors.append("High ratio of encrypted traffic")
+                encrypted_ratio = fmean(map(attrgetter('is_encrypted'), endpoint.traffic_samples))
+                if encrypted_ratio > 0.9:
+                    risk_factors.append("High ratio of encrypted traffic")
                     
             # Check process legitimacy
             if endpoint.process_info and endpoint.process_info.name:
-                if endpoint.process_info.name not in self.known_safe_processes:
+                if endpoint.process_info.name.lower() not in KNOWN_SAFE_PROCESSES:
                     risk_factors.append(f"Suspicious process: {endpoint.process_info.name}")
                     
             # Calculate trust score
@@ -649,10 +741,10 @@ class NetworkIntelligenceGatherer:
                 score += 0.1
                 
             # Consider performance metrics
-            if hasattr(endpoint, 'packet_loss') and endpoint.packet_loss > 50:
+            if endpoint.packet_loss > 50:
                 score -= 0.1
                 
-            if hasattr(endpoint, 'latency') and endpoint.latency > 500:
+            if endpoint.latency > 500:
                 score -= 0.1
                 
             # Ensure score is between 0 and 1
@@ -679,14 +771,7 @@ class NetworkIntelligenceGatherer:
 
     def get_recommendation(self, risk_level: str) -> str:
         """Get security recommendation based on risk level"""
-        recommendations = {
-            "CRITICAL": "Immediate action required: Block this connection and investigate",
-            "HIGH": "Recommended action: Monitor closely and consider blocking",
-            "MEDIUM": "Caution advised: Monitor for suspicious behavior",
-            "LOW": "Normal monitoring recommended",
-            "UNKNOWN": "Unable to determine risk level - manual investigation recommended"
-        }
-        return recommendations.get(risk_level, "Unknown risk level - manual investigation recommended")
+        return RECOMMENDATIONS.get(risk_level, "Unknown risk level - manual investigation recommended")
 
     def update_history(self, endpoint: NetworkEndpoint):
         """Update connection history"""
@@ -729,15 +814,32 @@ class NetworkIntelligenceGatherer:
                 'is_safe': endpoint.is_safe,
                 'risk_assessment': endpoint.security_assessment.to_dict() if endpoint.security_assessment else None,
                 'process_info': endpoint.process_info.to_dict() if endpoint.process_info else None,
-                'traffic_samples': [sample.to_dict() for sample in endpoint.traffic_samples] if endpoint.traffic_samples else []
+                'traffic_samples': endpoint.traffic_samples
             }
             
             if format.lower() == 'json':
-                return json.dumps(data, indent=2)
+                # Samples are encoded straight from the dataclasses, without
+                # building an intermediate dict per sample first
+                if orjson is not None:
+                    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+                return json.dumps(data, indent=2, default=TrafficSample.to_dict)
             elif format.lower() == 'csv':
-                # Implement CSV export if needed
-                pass
+                # One row per traffic sample, written through the C csv writer
+                output = io.StringIO()
+                writer = csv.writer(output)
+                writer.writerow([
+                    'host', 'port', 'timestamp', 'source_port', 'destination_port',
+                    'protocol', 'payload_size', 'is_encrypted', 'packet_type'
+                ])
+                writer.writerows(
+                    (endpoint.host, endpoint.port, sample.timestamp.isoformat(),
+                     sample.source_port, sample.destination_port, sample.protocol,
+                     sample.payload_size, sample.is_encrypted, sample.packet_type)
+                    for sample in endpoint.traffic_samples
+                )
+                return output.getvalue()
             else:
+                data['traffic_samples'] = list(map(TrafficSample.to_dict, endpoint.traffic_samples))
                 return str(data)
                 
         except Exception as e:
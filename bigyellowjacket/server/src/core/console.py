@@ -1,12 +1,60 @@
 import asyncio
+import io
 import os
+import shutil
+import signal
 import sys
-from datetime import datetime
+import time
+from collections import deque
+from datetime import datetime, timedelta
 import psutil
 from colorama import Fore, Style
 from src.models.datatypes import NetworkEndpoint
 from src.utils.logger import logger
-from typing import Dict, List
+from typing import Deque, Dict, List, Optional, Set
+
+# ANSI erase-display + cursor-home; colorama translates it on Windows consoles
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# The banner never changes, so it is built once at import
+HEADER = "\n".join([
+    f"{Fore.YELLOW}",
+    "=" * 100,
+    """
+    ____  _       __   __ _ _                 _            _        __ 
+   / __ )(_)__ _ / /  / /(_) /__ ___ _    __/ /__ ____  (_)__ ___/ /_
+  / __  / //  ' / _ \/ // /  ' \/ _ `/ |/|/ / / -_) __/ / / // _  / -_)
+ /_/ /_/_//_/_/_.__/_//_/_/_/_/\_,_/|__,__/_/\__/_/ __/ /\_,_/_,_/\__/ 
+                              Security Monitor v2.0
+        """,
+    "=" * 100,
+    f"{Style.RESET_ALL}"
+])
+
+# Every colored progress bar at the default width, indexed by [color][filled cells]
+PROGRESS_BAR_WIDTH = 20
+PROGRESS_BAR_COLORS = (Fore.GREEN, Fore.YELLOW, Fore.RED)
+PROGRESS_BARS = tuple(
+    tuple(
+        f"{color}{'█' * filled + '░' * (PROGRESS_BAR_WIDTH - filled)}{Style.RESET_ALL}"
+        for filled in range(PROGRESS_BAR_WIDTH + 1)
+    )
+    for color in PROGRESS_BAR_COLORS
+)
+
+# Box-drawing borders and the connection table heading (the tables are 100 columns wide)
+BORDER_TOP = "┌" + "─" * 98 + "┐"
+BORDER_MIDDLE = "├" + "─" * 98 + "┤"
+BORDER_BOTTOM = "└" + "─" * 98 + "┘"
+TABLE_HEADER = f"│ {'IP Address':<20} {'Port':<8} {'Status':<12} {'Process':<15} {'Type':<12} {'Latency':<10} │"
+
+# Active connection table row and the (label, color) shown for safe/unsafe endpoints
+ROW_FORMAT = ("│ {color}{host:<20}{reset} {port:<8} {color}{status:<12}{reset} "
+              "{process:<15} {device:<12} {latency:<10} │")
+STATUS_STYLES = {
+    True: ("SAFE", Fore.GREEN),
+    False: ("SUSPICIOUS", Fore.RED)
+}
 
 class ConsoleMonitor:
     """Real-time console display for network monitoring"""
@@ -14,149 +62,257 @@ class ConsoleMonitor:
     def __init__(self, enable_console: bool = True):
         self.enable_console = enable_console
         self.endpoints: Dict[str, NetworkEndpoint] = {}
+        self.row_cache: Dict[str, Optional[str]] = {}
+        self.stale_rows: Set[str] = set()
         self.start_time = datetime.now()
+        self.start_monotonic = time.monotonic()
         self.total_connections = 0
         self.blocked_count = 0
         self.alert_count = 0
-        self.last_update = datetime.now()
         self.refresh_rate = 1
-        self.recent_alerts = []
         self.max_recent_alerts = 5
+        self.recent_alerts: Deque[dict] = deque(maxlen=self.max_recent_alerts)
+        self.alert_lines: Deque[str] = deque(maxlen=self.max_recent_alerts)
         self.running = True
+        
+        # Differential redraw state
+        self.last_lines: List[str] = []
+        self.needs_full_redraw = True
+        self.frames_since_redraw = 0
+        self.full_redraw_interval = 10  # frames
+        self.terminal_rows = shutil.get_terminal_size().lines
+        self.ansi_supported = os.environ.get('TERM') != 'dumb'
+        
+        # Frames go straight to the binary stdout buffer unless stdout has been
+        # replaced (e.g. by colorama's ANSI-to-Win32 wrapper on legacy consoles)
+        if isinstance(sys.stdout, io.TextIOWrapper):
+            self.stdout_buffer = sys.stdout.buffer
+            self.stdout_encoding = sys.stdout.encoding
+        else:
+            self.stdout_buffer = None
+            self.stdout_encoding = None
+        
+        # Adaptive refresh: repaint when state changed, or periodically when idle
+        self.dirty = True
+        self.min_refresh_interval = 0.05  # seconds
+        self.idle_refresh_rate = 5  # seconds
+        self.rendered_uptime = -1  # whole seconds shown on the last frame
+        self.render_cost = 0.0
+        self.last_render = 0.0
+        
+        # System usage is sampled in the background, off the render path
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+        self.sample_interval = 2  # seconds
 
     async def start_updates(self):
         """Start the console update loop"""
         logger.info("Starting console updates...")
-        while self.running:
+        # Repaint fully when the terminal is resized (not available on Windows)
+        if hasattr(signal, 'SIGWINCH'):
             try:
-                if self.enable_console:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGWINCH, self.request_full_redraw
+                )
+            except (NotImplementedError, RuntimeError):
+                pass
+        sampler = asyncio.create_task(self.sample_system_usage())
+        try:
+            await self.run_updates()
+        finally:
+            sampler.cancel()
+
+    async def run_updates(self):
+        """Repaint the console until stopped"""
+        failures = 0
+        while self.running:
+            # Nothing can be drawn once stdout is gone
+            if sys.stdout.closed:
+                logger.warning("Console output closed, stopping console updates")
+                self.running = False
+                break
+                
+            # Keep a steady cadence by discounting the time spent rendering
+            delay = max(self.min_refresh_interval, self.refresh_rate - self.render_cost)
+            now = time.monotonic()
+            # The uptime line changes every second even when nothing else does
+            if int(now - self.start_monotonic) != self.rendered_uptime:
+                self.dirty = True
+            if self.enable_console and (
+                    self.dirty or now - self.last_render >= self.idle_refresh_rate):
+                self.dirty = False
+                self.last_render = now
+                try:
                     self.print_status()
-                await asyncio.sleep(self.refresh_rate)
+                    self.render_cost = time.monotonic() - now
+                    failures = 0
+                except Exception as e:
+                    # Back off exponentially while rendering keeps failing
+                    failures += 1
+                    delay = min(self.refresh_rate * 2 ** failures, 30)
+                    logger.error(f"Error in console update: {e}")
+            await asyncio.sleep(delay)
+
+    async def sample_system_usage(self):
+        """Refresh the cached CPU and memory usage at a fixed cadence"""
+        while self.running:
+            try:
+                cpu_percent = psutil.cpu_percent()
+                memory_percent = psutil.virtual_memory().percent
+                if (cpu_percent, memory_percent) != (self.cpu_percent, self.memory_percent):
+                    self.cpu_percent, self.memory_percent = cpu_percent, memory_percent
+                    self.dirty = True
             except Exception as e:
-                logger.error(f"Error in console update: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"Error sampling system usage: {e}")
+            await asyncio.sleep(self.sample_interval)
 
     def stop_updates(self):
         """Stop the console update loop"""
         self.running = False
         logger.info("Stopping console updates...")
 
-    def clear_screen(self):
-        """Clear the console screen"""
-        if os.name == 'nt':  # Windows
-            os.system('cls')
-        else:  # Unix/Linux/Mac
-            os.system('clear')
-
     def print_status(self):
         """Print complete status display"""
-        if not self.enable_console:
-            return
-
-        if (datetime.now() - self.last_update).total_seconds() < self.refresh_rate:
-            return
+        # Build the whole frame first, then emit it with a single write
+        buf = []
+        self.print_header(buf)
+        self.print_system_status(buf)
+        self.print_active_connections(buf)
+        self.print_alerts(buf)
+        self.print_performance(buf)
+        lines = '\n'.join(buf).split('\n')
+        
+        self.frames_since_redraw += 1
+        if not self.ansi_supported:
+            # Dumb terminals cannot clear or move the cursor; scroll the old frame away
+            output = '\n' * self.terminal_rows + '\n'.join(lines) + '\n'
+        elif (self.needs_full_redraw or len(lines) >= self.terminal_rows or
+                self.frames_since_redraw >= self.full_redraw_interval):
+            # Full repaint; also heals the screen after stray log output
+            output = CLEAR_SCREEN + '\n'.join(lines) + '\n'
+            self.needs_full_redraw = False
+            self.frames_since_redraw = 0
+        else:
+            # Rewrite only the rows that changed since the last frame
+            last_lines = self.last_lines
+            output = ''.join(
+                f"\x1b[{row};1H\x1b[K{line}"
+                for row, line in enumerate(lines, 1)
+                if row > len(last_lines) or last_lines[row - 1] != line
+            )
+            if len(lines) < len(last_lines):
+                output += f"\x1b[{len(lines) + 1};1H\x1b[J"
+            output += f"\x1b[{len(lines) + 1};1H"
+        
+        self.last_lines = lines
+        if self.stdout_buffer is not None:
+            # Encode the frame once and hand it to the binary layer directly
+            sys.stdout.flush()
+            self.stdout_buffer.write(output.encode(self.stdout_encoding, 'replace'))
+            self.stdout_buffer.flush()
+        else:
+            sys.stdout.write(output)
+            sys.stdout.flush()
 
-        self.last_update = datetime.now()
-        self.clear_screen()
-        self.print_header()
-        self.print_system_status()
-        self.print_active_connections()
-        self.print_alerts()
-        self.print_performance()
+    def request_full_redraw(self):
+        """Repaint the whole screen on the next refresh (e.g. after a resize)"""
+        self.terminal_rows = shutil.get_terminal_size().lines
+        self.needs_full_redraw = True
+        self.dirty = True
 
-    def print_header(self):
+    def print_header(self, buf: List[str]):
         """Print the application header"""
-        print(f"{Fore.YELLOW}")
-        print("=" * 100)
-        print("""
-    ____  _       __   __ _ _                 _            _        __ 
-   / __ )(_)__ _ / /  / /(_) /__ ___ _    __/ /__ ____  (_)__ ___/ /_
-  / __  / //  ' / _ \/ // /  ' \/ _ `/ |/|/ / / -_) __/ / / // _  / -_)
- /_/ /_/_//_/_/_.__/_//_/_/_/_/\_,_/|__,__/_/\__/_/ __/ /\_,_/_,_/\__/ 
-                              Security Monitor v2.0
-        """)
-        print("=" * 100)
-        print(f"{Style.RESET_ALL}")
+        buf.append(HEADER)
 
-    def print_system_status(self):
+    def print_system_status(self, buf: List[str]):
         """Print system status section"""
-        uptime = datetime.now() - self.start_time
-        print(f"\n{Fore.CYAN}█ System Status {Style.RESET_ALL}")
-        print(f"├─ Uptime: {str(uptime).split('.')[0]}")
-        print(f"├─ Total Connections: {self.total_connections}")
-        print(f"├─ Active Endpoints: {len(self.endpoints)}")
-        print(f"├─ Blocked IPs: {self.blocked_count}")
-        print(f"└─ Security Alerts: {self.alert_count}")
-
-    def print_active_connections(self):
+        self.rendered_uptime = int(time.monotonic() - self.start_monotonic)
+        uptime = timedelta(seconds=self.rendered_uptime)
+        buf.append(f"\n{Fore.CYAN}█ System Status {Style.RESET_ALL}")
+        buf.append(f"├─ Uptime: {uptime}")
+        buf.append(f"├─ Total Connections: {self.total_connections}")
+        buf.append(f"├─ Active Endpoints: {len(self.endpoints)}")
+        buf.append(f"├─ Blocked IPs: {self.blocked_count}")
+        buf.append(f"└─ Security Alerts: {self.alert_count}")
+
+    def print_active_connections(self, buf: List[str]):
         """Print active connections section"""
-        print(f"\n{Fore.CYAN}█ Active Connections {Style.RESET_ALL}")
+        buf.append(f"\n{Fore.CYAN}█ Active Connections {Style.RESET_ALL}")
         if not self.endpoints:
-            print("└─ No active connections")
+            buf.append("└─ No active connections")
             return
 
-        print("┌" + "─" * 98 + "┐")
-        print(f"│ {'IP Address':<20} {'Port':<8} {'Status':<12} {'Process':<15} {'Type':<12} {'Latency':<10} │")
-        print("├" + "─" * 98 + "┤")
+        buf.append(BORDER_TOP)
+        buf.append(TABLE_HEADER)
+        buf.append(BORDER_MIDDLE)
         
-        for endpoint in self.endpoints.values():
-            status_color = Fore.GREEN if endpoint.is_safe else Fore.RED
-            status = "SAFE" if endpoint.is_safe else "SUSPICIOUS"
-            latency = f"{endpoint.latency:.1f}ms" if endpoint.latency else "N/A"
-            process = endpoint.process_info.name if endpoint.process_info else "Unknown"
-            device_type = endpoint.device_type or "Unknown"
-            
-            print(f"│ {status_color}{endpoint.host:<20}{Style.RESET_ALL} "
-                  f"{endpoint.port:<8} "
-                  f"{status_color}{status:<12}{Style.RESET_ALL} "
-                  f"{process:<15} "
-                  f"{device_type:<12} "
-                  f"{latency:<10} │")
+        # Only rows for endpoints updated since the last frame are re-rendered;
+        # row_cache shares the endpoints' key order, so the rest are copied as-is
+        row_cache, endpoints, format_row = self.row_cache, self.endpoints, self.format_row
+        for key in self.stale_rows:
+            row_cache[key] = format_row(endpoints[key])
+        self.stale_rows.clear()
+        buf.extend(row_cache.values())
+
+        buf.append(BORDER_BOTTOM)
 
-        print("└" + "─" * 98 + "┘")
+    def format_row(self, endpoint: NetworkEndpoint) -> str:
+        """Render one active connection table row"""
+        status, status_color = STATUS_STYLES[bool(endpoint.is_safe)]
+        process_info = endpoint.process_info
+        latency = endpoint.latency
+        return ROW_FORMAT.format(
+            color=status_color,
+            reset=Style.RESET_ALL,
+            host=endpoint.host,
+            port=endpoint.port,
+            status=status,
+            process=process_info.name if process_info is not None else "Unknown",
+            device=endpoint.device_type or "Unknown",
+            latency=f"{latency:.1f}ms" if latency else "N/A"
+        )
 
-    def print_alerts(self):
+    def print_alerts(self, buf: List[str]):
         """Print recent alerts section"""
         if self.recent_alerts:
-            print(f"\n{Fore.CYAN}█ Recent Alerts {Style.RESET_ALL}")
-            print("┌" + "─" * 98 + "┐")
-            for alert in self.recent_alerts[-5:]:
-                alert_time = datetime.fromisoformat(alert['timestamp']).strftime('%H:%M:%S')
-                print(f"│ {Fore.RED}[{alert_time}] {alert['type']}: {alert['details'][:80]}{Style.RESET_ALL}")
-            print("└" + "─" * 98 + "┘")
+            buf.append(f"\n{Fore.CYAN}█ Recent Alerts {Style.RESET_ALL}")
+            buf.append(BORDER_TOP)
+            buf.extend(self.alert_lines)
+            buf.append(BORDER_BOTTOM)
 
-    def print_performance(self):
+    def print_performance(self, buf: List[str]):
         """Print system performance section"""
-        print(f"\n{Fore.CYAN}█ System Performance {Style.RESET_ALL}")
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        print(f"├─ CPU Usage: {self.get_progress_bar(cpu_percent)} {cpu_percent}%")
-        print(f"└─ Memory Usage: {self.get_progress_bar(memory.percent)} {memory.percent}%")
+        buf.append(f"\n{Fore.CYAN}█ System Performance {Style.RESET_ALL}")
+        buf.append(f"├─ CPU Usage: {self.get_progress_bar(self.cpu_percent)} {self.cpu_percent}%")
+        buf.append(f"└─ Memory Usage: {self.get_progress_bar(self.memory_percent)} {self.memory_percent}%")
 
     def get_progress_bar(self, percentage: float, width: int = 20) -> str:
         """Generate a colored progress bar"""
-        filled = int(width * percentage / 100)
+        filled = max(0, min(width, int(width * percentage / 100)))
+        color = 0 if percentage < 60 else 1 if percentage < 80 else 2
+        if width == PROGRESS_BAR_WIDTH:
+            return PROGRESS_BARS[color][filled]
         bar = '█' * filled + '░' * (width - filled)
-        if percentage < 60:
-            return f"{Fore.GREEN}{bar}{Style.RESET_ALL}"
-        elif percentage < 80:
-            return f"{Fore.YELLOW}{bar}{Style.RESET_ALL}"
-        else:
-            return f"{Fore.RED}{bar}{Style.RESET_ALL}"
+        return f"{PROGRESS_BAR_COLORS[color]}{bar}{Style.RESET_ALL}"
 
     def update_endpoint(self, endpoint: NetworkEndpoint):
         """Update endpoint information"""
         key = f"{endpoint.host}:{endpoint.port}"
-        if key not in self.endpoints:
-            endpoint.first_seen = datetime.now()
+        now = datetime.now()
+        existing = self.endpoints.get(key)
+        if existing is None:
+            endpoint.first_seen = now
             endpoint.connection_count = 1
             self.total_connections += 1
         else:
-            endpoint.connection_count = self.endpoints[key].connection_count + 1
-            endpoint.first_seen = self.endpoints[key].first_seen
+            endpoint.connection_count = existing.connection_count + 1
+            endpoint.first_seen = existing.first_seen
         
-        endpoint.last_seen = datetime.now()
+        endpoint.last_seen = now
         self.endpoints[key] = endpoint
+        self.row_cache[key] = None
+        self.stale_rows.add(key)
+        self.dirty = True
         
         if not endpoint.is_safe and self.enable_console:
             logger.warning(f"Suspicious connection detected: {endpoint.host}:{endpoint.port}")
@@ -167,10 +323,14 @@ class ConsoleMonitor:
         key = f"{host}:{port}"
         if key in self.endpoints:
             del self.endpoints[key]
+            del self.row_cache[key]
+            self.stale_rows.discard(key)
+            self.dirty = True
 
     def increment_blocked(self):
         """Increment blocked connections counter"""
         self.blocked_count += 1
+        self.dirty = True
 
     @staticmethod
     def format_bytes(bytes_val: int) -> str:
@@ -183,29 +343,31 @@ class ConsoleMonitor:
     
     def add_alert(self, alert: dict):
         try:
-            # Format the alert if needed
-            if isinstance(alert, dict):
-                if 'details' in alert and isinstance(alert['details'], dict):
-                    # Convert dict details to string
-                    details_str = ', '.join(f"{k}: {v}" for k, v in alert['details'].items())
-                    alert = {
-                        **alert,
-                        'details': details_str
-                    }
-
-            # Add to recent alerts
+            # Convert dict details to string; the monitor keeps (and saves) the
+            # original alert, so only this branch takes a shallow copy
+            details = alert.get('details')
+            if isinstance(details, dict):
+                alert = dict(alert)
+                alert['details'] = ', '.join(f"{k}: {v}" for k, v in details.items())
+
+            # Alerts never change once added, so render their table row only once
+            if 'timestamp' in alert:
+                alert_time = datetime.fromisoformat(alert['timestamp']).strftime('%H:%M:%S')
+            else:
+                alert_time = datetime.now().strftime('%H:%M:%S')
+            line = f"│ {Fore.RED}[{alert_time}] {alert['type']}: {alert['details'][:80]}{Style.RESET_ALL}"
+
+            # Add to recent alerts (the deques drop the oldest beyond max_recent_alerts)
             self.recent_alerts.append(alert)
-            
-            # Keep only the most recent alerts
-            if len(self.recent_alerts) > self.max_recent_alerts:
-                self.recent_alerts = self.recent_alerts[-self.max_recent_alerts:]
+            self.alert_lines.append(line)
                 
             # Update alert count
             self.alert_count += 1
+            self.dirty = True
             
             # Print alert immediately if console is enabled
             if self.enable_console:
-                alert_time = datetime.fromisoformat(alert['timestamp']).strftime('%H:%M:%S')
+                self.needs_full_redraw = True
                 print(f"{Fore.RED}[ALERT] [{alert_time}] {alert['type']}: {alert['details']}{Style.RESET_ALL}")
                 
         except Exception as e:
@@ -213,9 +375,11 @@ class ConsoleMonitor:
 
     def get_alerts(self) -> List[dict]:
         """Get recent alerts"""
-        return self.recent_alerts
+        return list(self.recent_alerts)
 
     def clear_alerts(self):
         """Clear all alerts"""
-        self.recent_alerts = []
-        self.alert_count = 0
\ No newline at end of file
+        self.recent_alerts.clear()
+        self.alert_lines.clear()
+        self.alert_count = 0
+        self.dirty = True
\ No newline at end of file
@@ -1,16 +1,43 @@
 import asyncio
 import psutil
-from datetime import datetime, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 from typing import Dict, List, Set, Optional
 from pathlib import Path
 import json
 import socket
 import time
+from collections import Counter, defaultdict, deque
 import aiofiles  # Add this line
 from src.utils.logger import logger
 from src.models.datatypes import NetworkEndpoint, ProcessInfo
 from src.analyzers.intelligence import NetworkIntelligenceGatherer
 
+# orjson is an optional, much faster encoder for alerts, stats and exports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rates reported before two statistics samples have been taken
+ZERO_RATES = {
+    "connections_per_second": 0.0,
+    "bytes_per_second": 0.0,
+    "alerts_per_second": 0.0
+}
+
+def json_default(obj):
+    """ISO 8601 for dates and times, as orjson writes them; str() otherwise"""
+    if isinstance(obj, (datetime, date, dt_time)):
+        return obj.isoformat()
+    return str(obj)
+
+def dump_json(data, indent: bool = False) -> str:
+    """Serialize data to JSON, falling back to str() for unknown types"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=str, option=option).decode()
+    return json.dumps(data, indent=2 if indent else None, default=json_default)
+
 class NetworkMonitor:
     """Core network monitoring system"""
     
@@ -19,23 +46,52 @@ class NetworkMonitor:
         self.active_connections: Dict[str, NetworkEndpoint] = {}
         self.blocked_ips: Set[str] = set()
         self.alerts = []
+        # Newest alerts for dashboards, independent of archiving
+        self.recent_alerts: deque = deque(maxlen=10)
         self.intelligence_gatherer = NetworkIntelligenceGatherer(console_monitor)
         self.connection_history: Dict[str, Dict] = {}
         self.last_check = 0
         self.check_interval = 2  # seconds
+        self.max_concurrent_intelligence = 32
+        self.intelligence_semaphore = asyncio.Semaphore(self.max_concurrent_intelligence)
         
         # Initialize tracking variables
         self.inbound_blocked = False
         self.outbound_blocked = False
-        self.monitoring_enabled = True
+        self.monitoring_event = asyncio.Event()
+        self.monitoring_event.set()
         self.alert_count = 0
         self.total_bytes_monitored = 0
         
+        # Running totals over active_connections, kept in step with the dict
+        self.connection_contributions: Dict[str, tuple] = {}
+        self.bytes_sent_total = 0
+        self.bytes_received_total = 0
+        self.risk_counts: Counter = Counter()
+        self.process_pids: Counter = Counter()
+        self.process_names: Counter = Counter()
+        # Active connection keys per remote host
+        self.host_index: Dict[str, Set[str]] = defaultdict(set)
+        
         # Statistics tracking
-        self.last_stats = None
+        self.last_stats: Optional[tuple] = None  # (active, bytes monitored, alerts)
         self.last_stats_time = datetime.now()
+        self._previous_stats: Optional[dict] = None
+        self._previous_stats_time: Optional[datetime] = None
+        self._rates = dict(ZERO_RATES)
         self.hourly_stats = []
         self.daily_stats = []
+        # Latest system metrics, refreshed by sample_system_metrics
+        self.system_metrics: Optional[dict] = None
+        self.system_sample_interval = 2  # seconds
+        
+        # Snapshots not yet appended to the history log
+        self.pending_history: List[dict] = []
+        self.stats_flush_interval = 30  # seconds
+        
+        # Alerts are streamed to a daily JSONL file by a single writer task
+        self.alert_queue: asyncio.Queue = asyncio.Queue()
+        self.alert_batch_size = 100
         
         # Load previously blocked IPs
         self.load_blocked_ips()
@@ -43,7 +99,18 @@ class NetworkMonitor:
         # Create required directories
         self.setup_directories()
         
-    # Rest of the code remains the same
+    @property
+    def monitoring_enabled(self) -> bool:
+        """Whether the monitoring loop is running scans"""
+        return self.monitoring_event.is_set()
+        
+    @monitoring_enabled.setter
+    def monitoring_enabled(self, enabled: bool):
+        if enabled:
+            self.monitoring_event.set()
+        else:
+            self.monitoring_event.clear()
+            
         
     def setup_directories(self):
         """Create required directories"""
@@ -56,51 +123,48 @@ class NetworkMonitor:
         try:
             blocked_file = Path("data/blocked_ips.txt")
             if blocked_file.exists():
-                with open(blocked_file) as f:
-                    self.blocked_ips.update(
-                        line.strip() for line in f
-                        if line.strip() and not line.startswith('#')
-                    )
+                # One bulk read; lines are only decoded once they are kept
+                lines = map(bytes.strip, blocked_file.read_bytes().splitlines())
+                self.blocked_ips.update(
+                    line.decode() for line in lines
+                    if line and not line.startswith(b'#')
+                )
                 logger.info(f"Loaded {len(self.blocked_ips)} blocked IPs")
         except Exception as e:
             logger.error(f"Error loading blocked IPs: {e}")
             
-    def save_blocked_ips(self):
+    async def save_blocked_ips(self):
         """Save blocked IPs to file"""
         try:
             blocked_file = Path("data/blocked_ips.txt")
-            with open(blocked_file, 'w') as f:
-                for ip in sorted(self.blocked_ips):
-                    f.write(f"{ip}\n")
+            async with aiofiles.open(blocked_file, 'w') as f:
+                await f.write(''.join(f"{ip}\n" for ip in sorted(self.blocked_ips)))
         except Exception as e:
             logger.error(f"Error saving blocked IPs: {e}")
             
-    async def get_process_connections(self) -> List[NetworkEndpoint]:
+    async def get_process_connections(self, now: Optional[datetime] = None) -> List[NetworkEndpoint]:
         """Get all active network connections"""
+        # Reading the socket table and process details blocks, so do it in one thread hop
+        return await asyncio.to_thread(self.collect_connections, now or datetime.now())
+        
+    def collect_connections(self, now: datetime) -> List[NetworkEndpoint]:
+        """Build endpoints for established connections to public hosts"""
         connections = []
+        # Sockets owned by the same process share one lookup per cycle
+        process_infos: Dict[int, Optional[ProcessInfo]] = {}
+        is_private_ip = self.intelligence_gatherer.is_private_ip
         try:
             for conn in psutil.net_connections(kind='inet'):
                 try:
                     if (conn.status == psutil.CONN_ESTABLISHED and 
                         conn.raddr and 
                         conn.raddr.ip and 
-                        not conn.raddr.ip.startswith(('127.', '192.168.', '10.', '172.16.'))):
+                        not is_private_ip(conn.raddr.ip)):
                         
-                        try:
-                            process = psutil.Process(conn.pid)
-                            process_info = ProcessInfo(
-                                pid=conn.pid,
-                                name=process.name(),
-                                path=process.exe(),
-                                command_line=' '.join(process.cmdline()),
-                                username=process.username(),
-                                creation_time=datetime.fromtimestamp(process.create_time()),
-                                cpu_percent=process.cpu_percent(),
-                                memory_percent=process.memory_percent(),
-                                status=process.status()
-                            )
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            process_info = None
+                        if conn.pid in process_infos:
+                            process_info = process_infos[conn.pid]
+                        else:
+                            process_info = process_infos[conn.pid] = self.get_process_info(conn.pid)
 
                         # Create endpoint
                         endpoint = NetworkEndpoint(
@@ -108,7 +172,7 @@ class NetworkMonitor:
                             port=conn.raddr.port,
                             protocol='TCP' if conn.type == socket.SOCK_STREAM else 'UDP',
                             connection_state=conn.status,
-                            last_seen=datetime.now(),
+                            last_seen=now,
                             process_info=process_info
                         )
                         
@@ -123,221 +187,267 @@ class NetworkMonitor:
             
         return connections
 
-    async def process_connections(self, connections: List[NetworkEndpoint]):
+    def get_process_info(self, pid: Optional[int]) -> Optional[ProcessInfo]:
+        """Snapshot a process, fetching all of its attributes in one pass"""
+        if pid is None:
+            return None
+        try:
+            info = psutil.Process(pid).as_dict(attrs=[
+                'name', 'exe', 'cmdline', 'username', 'create_time',
+                'cpu_percent', 'memory_percent', 'status'
+            ])
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        return ProcessInfo(
+            pid=pid,
+            name=info['name'],
+            path=info['exe'],
+            command_line=' '.join(info['cmdline'] or []),
+            username=info['username'],
+            creation_time=datetime.fromtimestamp(info['create_time']) if info['create_time'] else None,
+            cpu_percent=info['cpu_percent'] or 0,
+            memory_percent=info['memory_percent'] or 0,
+            status=info['status']
+        )
+
+    async def process_connections(self, connections: List[NetworkEndpoint], now: Optional[datetime] = None):
         """Process list of connections concurrently"""
-        tasks = []
+        now = now or datetime.now()
+        async def gather_bounded(endpoint: NetworkEndpoint) -> NetworkEndpoint:
+            # Cap how many endpoints are probed at once
+            async with self.intelligence_semaphore:
+                return await self.intelligence_gatherer.gather_intelligence(endpoint)
+        
+        # Sockets to the same remote endpoint share one record, so gather it once
+        unique: Dict[tuple, NetworkEndpoint] = {}
         for endpoint in connections:
-            if endpoint.host not in self.blocked_ips:
-                if not self.inbound_blocked or not self.is_inbound(endpoint):
-                    if not self.outbound_blocked or not self.is_outbound(endpoint):
-                        task = asyncio.create_task(
-                            self.intelligence_gatherer.gather_intelligence(endpoint)
-                        )
-                        tasks.append(task)
+            unique.setdefault((endpoint.host, endpoint.port), endpoint)
+        
+        tasks = [
+            gather_bounded(endpoint) for endpoint in unique.values()
+            if endpoint.host not in self.blocked_ips
+            and (not self.inbound_blocked or not self.is_inbound(endpoint))
+            and (not self.outbound_blocked or not self.is_outbound(endpoint))
+        ]
         
         if tasks:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             for endpoint in results:
                 if isinstance(endpoint, NetworkEndpoint):
-                    await self.update_connection_status(endpoint)
+                    await self.update_connection_status(endpoint, now)
                 elif isinstance(endpoint, Exception):
                     logger.error(f"Error processing connection: {endpoint}")
 
-    async def update_statistics(self):
-            """Update real-time statistics"""
-            try:
-                current_time = datetime.now()
-                current_stats = self.get_statistics()
-
-                # Update historical trends
-                if not hasattr(self, '_previous_stats'):
-                    self._previous_stats = current_stats
-                    self._previous_stats_time = current_time
-                    return
-
-                # Calculate time difference
-                time_diff = (current_time - self._previous_stats_time).total_seconds()
-                if time_diff > 0:
-                    try:
-                        # Calculate connection rate
-                        connection_change = (
-                            current_stats["connections"]["active"] - 
-                            self._previous_stats["connections"]["active"]
-                        )
-                        
-                        # Calculate traffic rate
-                        traffic_change = (
-                            current_stats["traffic"]["total_bytes_monitored"] - 
-                            self._previous_stats["traffic"]["total_bytes_monitored"]
-                        )
-                        
-                        # Calculate alert rate
-                        alert_change = (
-                            current_stats["security"]["total_alerts"] - 
-                            self._previous_stats["security"]["total_alerts"]
-                        )
-
-                        # Store rates
-                        self._rates = {
-                            "connections_per_second": connection_change / time_diff,
-                            "bytes_per_second": traffic_change / time_diff,
-                            "alerts_per_second": alert_change / time_diff
-                        }
-                    except KeyError:
-                        # Handle missing keys in previous stats
-                        self._rates = {
-                            "connections_per_second": 0,
-                            "bytes_per_second": 0,
-                            "alerts_per_second": 0
-                        }
+    async def update_statistics(self, now: Optional[datetime] = None):
+        """Update real-time statistics"""
+        try:
+            current_time = now or datetime.now()
+            current_stats = self.get_statistics(current_time)
 
-                # Update previous stats
+            # Update historical trends
+            if self._previous_stats is None:
                 self._previous_stats = current_stats
                 self._previous_stats_time = current_time
+                return
 
-                # Save current stats to historical data
-                self.update_historical_stats()
-
-            except Exception as e:
-                logger.error(f"Error updating statistics: {e}")
+            # Calculate time difference
+            time_diff = (current_time - self._previous_stats_time).total_seconds()
+            if time_diff > 0:
+                try:
+                    # Calculate connection rate
+                    connection_change = (
+                        current_stats["connections"]["active"] - 
+                        self._previous_stats["connections"]["active"]
+                    )
+                    
+                    # Calculate traffic rate
+                    traffic_change = (
+                        current_stats["traffic"]["total_bytes_monitored"] - 
+                        self._previous_stats["traffic"]["total_bytes_monitored"]
+                    )
+                    
+                    # Calculate alert rate
+                    alert_change = (
+                        current_stats["security"]["total_alerts"] - 
+                        self._previous_stats["security"]["total_alerts"]
+                    )
 
-            @property
-            def current_rates(self) -> dict:
-                """Get current rates"""
-                if not hasattr(self, '_rates'):
+                    # Store rates
                     self._rates = {
-                        "connections_per_second": 0,
-                        "bytes_per_second": 0,
-                        "alerts_per_second": 0
+                        "connections_per_second": connection_change / time_diff,
+                        "bytes_per_second": traffic_change / time_diff,
+                        "alerts_per_second": alert_change / time_diff
                     }
-                return self._rates
+                except KeyError:
+                    # Handle missing keys in previous stats
+                    self._rates = dict(ZERO_RATES)
+
+            # Update previous stats
+            self._previous_stats = current_stats
+            self._previous_stats_time = current_time
+
+            # Save current stats to historical data
+            self.update_historical_stats(current_time, current_stats)
+
+        except Exception as e:
+            logger.error(f"Error updating statistics: {e}")
+
+    @property
+    def current_rates(self) -> dict:
+        """Get current rates"""
+        return self._rates
 
     async def start_monitoring(self):
         """Start network monitoring"""
         logger.info("Starting network monitoring...")
+        self.stats_flush_task = asyncio.create_task(self.flush_historical_stats())
+        self.alert_writer_task = asyncio.create_task(self.write_alerts())
+        self.system_sampler_task = asyncio.create_task(self.sample_system_metrics())
         
-        while True:
-            try:
-                if not self.monitoring_enabled:
-                    await asyncio.sleep(1)
-                    continue
-                    
-                current_time = time.time()
-                if current_time - self.last_check >= self.check_interval:
+        try:
+            while True:
+                try:
+                    # Sleeps until monitoring is (re-)enabled instead of polling
+                    await self.monitoring_event.wait()
+                    cycle_start = time.monotonic()
+                
+                    # One wall-clock reading is shared by the whole cycle
+                    now = datetime.now()
+                
                     # Get current connections
-                    connections = await self.get_process_connections()
-                    
+                    connections = await self.get_process_connections(now)
+                
                     # Process connections concurrently
-                    await self.process_connections(connections)
-                    
-                    self.last_check = current_time
-                    
+                    await self.process_connections(connections, now)
+                
+                    self.last_check = time.time()
+                
                     # Cleanup and maintenance
-                    await self.perform_maintenance()
-                    
+                    await self.perform_maintenance(now)
+                
                     # Update statistics
-                    await self.update_statistics()
-                    
-                await asyncio.sleep(1)
+                    await self.update_statistics(now)
                 
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(5)
+                    # Wake once per check interval, measured from the start of the cycle
+                    await asyncio.sleep(max(0, self.check_interval - (time.monotonic() - cycle_start)))
                 
-    async def perform_maintenance(self):
+                except Exception as e:
+                    logger.error(f"Error in monitoring loop: {e}")
+                    await asyncio.sleep(5)
+                    
+        finally:
+            # Stop the background writers, then persist whatever is still pending
+            tasks = [self.stats_flush_task, self.alert_writer_task, self.system_sampler_task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.save_historical_stats()
+            
+    async def perform_maintenance(self, now: Optional[datetime] = None):
         """Perform regular maintenance tasks"""
+        now = now or datetime.now()
         try:
             # Cleanup old connections
-            self.cleanup_old_connections()
+            self.cleanup_old_connections(now)
             
             # Archive old alerts
-            await self.archive_old_alerts()
+            await self.archive_old_alerts(now)
             
-            # Update historical statistics
-            self.update_historical_stats()
+            # Historical statistics are updated by update_statistics
             
         except Exception as e:
             logger.error(f"Error in maintenance: {e}")
 
-    async def archive_old_alerts(self):
+    async def archive_old_alerts(self, now: Optional[datetime] = None):
         """Archive alerts older than 24 hours"""
         try:
-            current_time = datetime.now()
-            old_alerts = []
-            
-            for alert in self.alerts[:]:
-                alert_time = datetime.fromisoformat(alert['timestamp'])
-                if (current_time - alert_time) > timedelta(hours=24):
-                    old_alerts.append(alert)
-                    self.alerts.remove(alert)
-            
-            if old_alerts:
+            current_time = now or datetime.now()
+            cutoff = current_time - timedelta(hours=24)
+            
+            # Alerts are appended in time order, so the expired ones form a prefix
+            expired = 0
+            for alert in self.alerts:
+                if datetime.fromisoformat(alert['timestamp']) >= cutoff:
+                    break
+                expired += 1
+            
+            if expired:
+                old_alerts = self.alerts[:expired]
+                del self.alerts[:expired]
                 archive_file = Path(f"data/alerts/archive_{current_time.strftime('%Y%m%d')}.json")
-                with open(archive_file, 'a') as f:
-                    for alert in old_alerts:
-                        f.write(json.dumps(alert) + '\n')
+                async with aiofiles.open(archive_file, 'a') as f:
+                    await f.write(''.join(dump_json(alert) + '\n' for alert in old_alerts))
                         
         except Exception as e:
             logger.error(f"Error archiving alerts: {e}")
 
-    def update_historical_stats(self):
+    def update_historical_stats(self, now: Optional[datetime] = None, current_stats: Optional[dict] = None):
         """Update historical statistics"""
         try:
-            current_time = datetime.now()
-            current_stats = self.get_statistics()
+            current_time = now or datetime.now()
+            hourly_due = not self.hourly_stats or (current_time - self.hourly_stats[-1]['timestamp'] > timedelta(hours=1))
+            daily_due = not self.daily_stats or (current_time - self.daily_stats[-1]['timestamp'] > timedelta(days=1))
+            if not (hourly_due or daily_due):
+                return
+                
+            if current_stats is None:
+                current_stats = self.get_statistics(current_time)
             
             # Update hourly stats
-            if not self.hourly_stats or (current_time - self.hourly_stats[-1]['timestamp'] > timedelta(hours=1)):
-                self.hourly_stats.append({
-                    'timestamp': current_time,
-                    'stats': current_stats
-                })
+            if hourly_due:
+                entry = {'timestamp': current_time, 'stats': current_stats}
+                self.hourly_stats.append(entry)
+                self.pending_history.append({'bucket': 'hourly', **entry})
                 # Keep last 24 hours
                 if len(self.hourly_stats) > 24:
                     self.hourly_stats.pop(0)
             
             # Update daily stats
-            if not self.daily_stats or (current_time - self.daily_stats[-1]['timestamp'] > timedelta(days=1)):
-                self.daily_stats.append({
-                    'timestamp': current_time,
-                    'stats': current_stats
-                })
+            if daily_due:
+                entry = {'timestamp': current_time, 'stats': current_stats}
+                self.daily_stats.append(entry)
+                self.pending_history.append({'bucket': 'daily', **entry})
                 # Keep last 30 days
                 if len(self.daily_stats) > 30:
                     self.daily_stats.pop(0)
-                    
-            # Save historical stats
-            self.save_historical_stats()
             
         except Exception as e:
             logger.error(f"Error updating historical stats: {e}")
 
-    def save_historical_stats(self):
-        """Save historical statistics to file"""
+    async def save_historical_stats(self):
+        """Append pending historical statistics to the history log"""
+        if not self.pending_history:
+            return
+        entries, self.pending_history = self.pending_history, []
         try:
-            stats_file = Path("data/stats/historical_stats.json")
-            with open(stats_file, 'w') as f:
-                json.dump({
-                    'hourly': self.hourly_stats,
-                    'daily': self.daily_stats
-                }, f, indent=2, default=str)
+            stats_file = Path("data/stats/historical_stats.jsonl")
+            payload = ''.join(dump_json(entry) + '\n' for entry in entries)
+            async with aiofiles.open(stats_file, 'a') as f:
+                await f.write(payload)
                 
         except Exception as e:
             logger.error(f"Error saving historical stats: {e}")
+            
+    async def flush_historical_stats(self):
+        """Periodically write new historical statistics"""
+        while True:
+            await asyncio.sleep(self.stats_flush_interval)
+            await self.save_historical_stats()
                 
-    async def update_connection_status(self, endpoint: NetworkEndpoint):
+    async def update_connection_status(self, endpoint: NetworkEndpoint, now: Optional[datetime] = None):
         """Update connection status and check for suspicious activity"""
         key = f"{endpoint.host}:{endpoint.port}"
+        now = now or datetime.now()
         
         # Check if this is a new connection
         is_new = key not in self.active_connections
         
         if is_new:
             # Check for rapid connections from this IP
+            recent_cutoff = now - timedelta(seconds=60)
             recent_connections = sum(
-                1 for conn in self.active_connections.values()
-                if conn.host == endpoint.host and 
-                (datetime.now() - conn.last_seen).total_seconds() < 60
+                1 for conn_key in self.host_index.get(endpoint.host, ())
+                if self.active_connections[conn_key].last_seen > recent_cutoff
             )
             
             if recent_connections > 3:
@@ -348,10 +458,12 @@ class NetworkMonitor:
                 )
         
         # Update connection record
+        self.remove_connection_totals(key)
         self.active_connections[key] = endpoint
+        self.add_connection_totals(key, endpoint)
         
         # Update history
-        self.update_history(endpoint)
+        self.update_history(endpoint, now)
         
         # Update metrics
         self.total_bytes_monitored += (endpoint.bytes_sent + endpoint.bytes_received)
@@ -372,13 +484,14 @@ class NetworkMonitor:
         """Determine if connection is outbound"""
         return not self.is_inbound(endpoint)
         
-    def update_history(self, endpoint: NetworkEndpoint):
+    def update_history(self, endpoint: NetworkEndpoint, now: Optional[datetime] = None):
         """Update connection history"""
         key = f"{endpoint.host}:{endpoint.port}"
+        now = now or datetime.now()
         
         if key not in self.connection_history:
             self.connection_history[key] = {
-                'first_seen': datetime.now(),
+                'first_seen': now,
                 'connection_count': 1,
                 'total_bytes_sent': 0,
                 'total_bytes_received': 0,
@@ -393,7 +506,7 @@ class NetworkMonitor:
         
         if endpoint.security_assessment:
             history['risk_levels'].append({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'level': endpoint.security_assessment.risk_level
             })
             
@@ -407,6 +520,7 @@ class NetworkMonitor:
         }
         
         self.alerts.append(alert)
+        self.recent_alerts.append(alert)
         self.alert_count += 1
         self.console.add_alert(alert)
         
@@ -419,81 +533,187 @@ class NetworkMonitor:
             self.connection_history[key]['alerts'].append(alert)
         
     async def save_alert(self, alert: dict):
-        """Save alert to file"""
-        try:
-            alert_dir = Path("data/alerts")
-            alert_file = alert_dir / f"alert_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            
-            async with aiofiles.open(alert_file, 'w') as f:
-                await f.write(json.dumps(alert, indent=2))
+        """Queue alert for the alert writer"""
+        await self.alert_queue.put(alert)
+        
+    async def write_alerts(self):
+        """Append queued alerts to the daily JSONL file"""
+        alert_dir = Path("data/alerts")
+        current_day = None
+        f = None
+        
+        async def write_batch(batch: List[dict]):
+            nonlocal current_day, f
+            try:
+                day = datetime.now().strftime('%Y%m%d')
+                if day != current_day:
+                    if f:
+                        f, previous = None, f
+                        await previous.close()
+                    f = await aiofiles.open(alert_dir / f"alerts-{day}.jsonl", 'a')
+                    current_day = day
+                    
+                await f.write(''.join(dump_json(alert) + '\n' for alert in batch))
+                await f.flush()
                 
-        except Exception as e:
-            logger.error(f"Error saving alert: {e}")
-            
-    def cleanup_old_connections(self):
-        """Remove old connections"""
-        current_time = datetime.now()
-        to_remove = []
+            except Exception as e:
+                logger.error(f"Error saving alerts: {e}")
         
-        for key, endpoint in self.active_connections.items():
-            if (current_time - endpoint.last_seen).total_seconds() > 300:  # 5 minutes
-                to_remove.append(key)
+        write = None
+        try:
+            while True:
+                batch = [await self.alert_queue.get()]
+                # Drain whatever else is already queued into the same write
+                while len(batch) < self.alert_batch_size and not self.alert_queue.empty():
+                    batch.append(self.alert_queue.get_nowait())
+                    
+                # Shielded: the executor-backed write cannot be interrupted, so a
+                # cancelled writer lets it finish instead of writing the batch again
+                write = asyncio.ensure_future(write_batch(batch))
+                await asyncio.shield(write)
+        finally:
+            # Let the in-progress batch finish, then persist anything still queued
+            if write and not write.done():
+                await write
+            remaining = []
+            while not self.alert_queue.empty():
+                remaining.append(self.alert_queue.get_nowait())
+            if remaining:
+                await write_batch(remaining)
+            if f:
+                await f.close()
+            
+    def cleanup_old_connections(self, now: Optional[datetime] = None):
+        """Remove old connections"""
+        cutoff = (now or datetime.now()) - timedelta(minutes=5)
+        to_remove = [
+            key for key, endpoint in self.active_connections.items()
+            if endpoint.last_seen < cutoff
+        ]
                 
         for key in to_remove:
             del self.active_connections[key]
+            self.remove_connection_totals(key)
+            
+    def add_connection_totals(self, key: str, endpoint: NetworkEndpoint):
+        """Add an active connection to the running statistics and host index"""
+        risk_level = endpoint.security_assessment.risk_level if endpoint.security_assessment else None
+        process = endpoint.process_info
+        pid = process.pid if process else None
+        name = process.name if process else None
+        
+        self.connection_contributions[key] = (
+            endpoint.host, endpoint.bytes_sent, endpoint.bytes_received, risk_level, pid, name
+        )
+        self.host_index[endpoint.host].add(key)
+        self.bytes_sent_total += endpoint.bytes_sent
+        self.bytes_received_total += endpoint.bytes_received
+        if risk_level:
+            self.risk_counts[risk_level] += 1
+        if pid:
+            self.process_pids[pid] += 1
+        if name:
+            self.process_names[name] += 1
+            
+    def remove_connection_totals(self, key: str):
+        """Remove a connection's contribution from the running statistics and host index"""
+        contribution = self.connection_contributions.pop(key, None)
+        if contribution is None:
+            return
+            
+        host, bytes_sent, bytes_received, risk_level, pid, name = contribution
+        host_keys = self.host_index[host]
+        host_keys.discard(key)
+        if not host_keys:
+            del self.host_index[host]
+            
+        self.bytes_sent_total -= bytes_sent
+        self.bytes_received_total -= bytes_received
+        # Subtracting with -= keeps zero entries; drop them so len() stays accurate
+        for counter, value in ((self.risk_counts, risk_level),
+                               (self.process_pids, pid),
+                               (self.process_names, name)):
+            if value:
+                counter[value] -= 1
+                if counter[value] <= 0:
+                    del counter[value]
+            
+    def count_recent_alerts(self, cutoff: datetime) -> int:
+        """Count alerts newer than cutoff"""
+        # Alerts are appended in time order, so walk back from the newest
+        count = 0
+        for alert in reversed(self.alerts):
+            if datetime.fromisoformat(alert['timestamp']) <= cutoff:
+                break
+            count += 1
+        return count
+        
+    def read_system_metrics(self) -> dict:
+        """Read current system-wide resource usage"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        net_io = psutil.net_io_counters()
+        # cpu_freq reads sysfs once per CPU on Linux
+        cpu_freq = psutil.cpu_freq()
+        return {
+            "cpu_percent": psutil.cpu_percent(),
+            "cpu_frequency": cpu_freq.current if cpu_freq else 0,
+            "memory_percent": memory.percent,
+            "memory_used": memory.used,
+            "memory_total": memory.total,
+            "disk_percent": disk.percent,
+            "disk_used": disk.used,
+            "disk_total": disk.total,
+            "network_bytes_sent": net_io.bytes_sent,
+            "network_bytes_recv": net_io.bytes_recv,
+            "network_packets_sent": net_io.packets_sent,
+            "network_packets_recv": net_io.packets_recv
+        }
+        
+    async def sample_system_metrics(self):
+        """Refresh the cached system metrics at a fixed cadence"""
+        while True:
+            try:
+                # disk_usage can block on slow mounts, so read off the loop
+                self.system_metrics = await asyncio.to_thread(self.read_system_metrics)
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+            await asyncio.sleep(self.system_sample_interval)
             
-    def get_statistics(self) -> dict:
+    def get_statistics(self, now: Optional[datetime] = None) -> dict:
         """Get current monitoring statistics"""
         try:
-            current_time = datetime.now()
+            current_time = now or datetime.now()
+            recent_alert_cutoff = current_time - timedelta(hours=1)
             
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            net_io = psutil.net_io_counters()
+            # System metrics come from the background sampler
+            if self.system_metrics is None:
+                self.system_metrics = self.read_system_metrics()
             
             stats = {
                 # System metrics
-                "system": {
-                    "cpu_percent": cpu_percent,
-                    "memory_percent": memory.percent,
-                    "memory_used": memory.used,
-                    "memory_total": memory.total,
-                    "disk_percent": disk.percent,
-                    "network_bytes_sent": net_io.bytes_sent,
-                    "network_bytes_recv": net_io.bytes_recv
-                },
+                "system": self.system_metrics,
                 
                 # Connection metrics
                 "connections": {
                     "active": len(self.active_connections),
                     "total": len(self.connection_history),
                     "blocked": len(self.blocked_ips),
-                    "suspicious": sum(
-                        1 for conn in self.active_connections.values()
-                        if conn.security_assessment and conn.security_assessment.risk_level != "LOW"
-                    ),
-                    "safe": sum(
-                        1 for conn in self.active_connections.values()
-                        if conn.security_assessment and conn.security_assessment.risk_level == "LOW"
-                    )
+                    "suspicious": self.risk_counts.total() - self.risk_counts["LOW"],
+                    "safe": self.risk_counts["LOW"]
                 },
                 
                 # Traffic metrics
                 "traffic": {
                     "total_bytes_monitored": self.total_bytes_monitored,
-                    "bytes_sent": sum(conn.bytes_sent for conn in self.active_connections.values()),
-                    "bytes_received": sum(conn.bytes_received for conn in self.active_connections.values())
+                    "bytes_sent": self.bytes_sent_total,
+                    "bytes_received": self.bytes_received_total
                 },
                 
 # Security metrics
                 "security": {
                     "total_alerts": self.alert_count,
-                    "recent_alerts": len([
-                        alert for alert in self.alerts
-                        if (current_time - datetime.fromisoformat(alert['timestamp'])).total_seconds() < 3600
-                    ]),
+                    "recent_alerts": self.count_recent_alerts(recent_alert_cutoff),
                     "blocked_ips": len(self.blocked_ips),
                     "inbound_blocked": self.inbound_blocked,
                     "outbound_blocked": self.outbound_blocked
@@ -501,14 +721,8 @@ class NetworkMonitor:
                 
                 # Process metrics
                 "processes": {
-                    "total": len(set(
-                        conn.process_info.pid for conn in self.active_connections.values()
-                        if conn.process_info and conn.process_info.pid
-                    )),
-                    "types": len(set(
-                        conn.process_info.name for conn in self.active_connections.values()
-                        if conn.process_info and conn.process_info.name
-                    ))
+                    "total": len(self.process_pids),
+                    "types": len(self.process_names)
                 },
                 
                 # Status flags
@@ -523,26 +737,30 @@ class NetworkMonitor:
             }
             
             # Calculate trends if we have previous stats
+            active = stats["connections"]["active"]
+            bytes_monitored = stats["traffic"]["total_bytes_monitored"]
+            total_alerts = stats["security"]["total_alerts"]
             if self.last_stats:
                 time_diff = (current_time - self.last_stats_time).total_seconds()
                 if time_diff > 0:
+                    last_active, last_bytes, last_alerts = self.last_stats
                     stats["trends"] = {
                         "connections": {
-                            "change": stats["connections"]["active"] - self.last_stats["connections"]["active"],
-                            "change_rate": (stats["connections"]["active"] - self.last_stats["connections"]["active"]) / time_diff
+                            "change": active - last_active,
+                            "change_rate": (active - last_active) / time_diff
                         },
                         "traffic": {
-                            "bytes_change": stats["traffic"]["total_bytes_monitored"] - self.last_stats["traffic"]["total_bytes_monitored"],
-                            "bytes_rate": (stats["traffic"]["total_bytes_monitored"] - self.last_stats["traffic"]["total_bytes_monitored"]) / time_diff
+                            "bytes_change": bytes_monitored - last_bytes,
+                            "bytes_rate": (bytes_monitored - last_bytes) / time_diff
                         },
                         "security": {
-                            "alerts_change": stats["security"]["total_alerts"] - self.last_stats["security"]["total_alerts"],
-                            "alerts_rate": (stats["security"]["total_alerts"] - self.last_stats["security"]["total_alerts"]) / time_diff
+                            "alerts_change": total_alerts - last_alerts,
+                            "alerts_rate": (total_alerts - last_alerts) / time_diff
                         }
                     }
             
-            # Store current stats for next trend calculation
-            self.last_stats = stats.copy()
+            # Keep only the counters the next trend calculation needs
+            self.last_stats = (active, bytes_monitored, total_alerts)
             self.last_stats_time = current_time
             
             return stats
@@ -554,60 +772,51 @@ class NetworkMonitor:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def block_ip(self, host: str):
+    async def block_ip(self, host: str):
         """Block an IP address"""
         try:
             self.blocked_ips.add(host)
-            self.save_blocked_ips()
+            await self.save_blocked_ips()
             
             # Close any active connections
-            for key in list(self.active_connections.keys()):
-                if self.active_connections[key].host == host:
-                    del self.active_connections[key]
+            closed = []
+            for key in list(self.host_index.get(host, ())):
+                closed.append(self.active_connections.pop(key))
+                self.remove_connection_totals(key)
                     
             # Update console
             self.console.increment_blocked()
             logger.info(f"Blocked IP: {host}")
             
             # Add block event to history
-            self.add_block_event(host)
+            await self.add_block_event(host, closed)
             
         except Exception as e:
             logger.error(f"Error blocking IP {host}: {e}")
 
-    def add_block_event(self, host: str):
+    async def add_block_event(self, host: str, connections: List[NetworkEndpoint]):
         """Record IP block event"""
         try:
             event = {
                 "timestamp": datetime.now().isoformat(),
                 "ip": host,
                 "reason": "Manual block",
-                "active_connections": [
-                    conn.to_dict() for conn in self.active_connections.values()
-                    if conn.host == host
-                ]
+                "active_connections": [conn.to_dict() for conn in connections]
             }
             
-            block_file = Path("data/blocked_events.json")
-            events = []
-            
-            if block_file.exists():
-                with open(block_file) as f:
-                    events = json.load(f)
-                    
-            events.append(event)
-            
-            with open(block_file, 'w') as f:
-                json.dump(events, f, indent=2)
+            # Append-only, one event per line
+            block_file = Path("data/blocked_events.jsonl")
+            async with aiofiles.open(block_file, 'a') as f:
+                await f.write(dump_json(event) + '\n')
                 
         except Exception as e:
             logger.error(f"Error recording block event: {e}")
                 
-    def unblock_ip(self, host: str):
+    async def unblock_ip(self, host: str):
         """Unblock an IP address"""
         try:
             self.blocked_ips.discard(host)
-            self.save_blocked_ips()
+            await self.save_blocked_ips()
             logger.info(f"Unblocked IP: {host}")
             
         except Exception as e:
@@ -680,8 +889,9 @@ class NetworkMonitor:
             export_dir = Path("data/exports")
             file_path = export_dir / f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_type}"
             
-            with open(file_path, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            payload = dump_json(export_data, indent=True)
+            async with aiofiles.open(file_path, 'w') as f:
+                await f.write(payload)
                 
             return {
                 'file': str(file_path),
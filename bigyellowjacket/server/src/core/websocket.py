@@ -1,100 +1,97 @@
 import asyncio
 import json
+import socket
 import ssl
+import time
 import websockets
 import psutil
 from datetime import datetime
 from pathlib import Path
-from typing import Set, Dict, Any, Optional
+from typing import Set, Dict, Any, Optional, Tuple, Union
 from src.utils.logger import logger
 from src.models.datatypes import NetworkEndpoint
 from config.settings import Config
 
-import asyncio
-import json
-import websockets
-import psutil
-from datetime import datetime
-from pathlib import Path
-from typing import Set, Dict, Any
-from src.utils.logger import logger
+# orjson is an optional, much faster codec for client messages
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dump_message(data) -> str:
+    """Serialize a client message; str keeps it a text frame for the UI"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=str)
+
+def load_message(message):
+    """Parse a client message (orjson errors subclass json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(message)
+    return json.loads(message)
+
+# Periodic full-state messages; a newer one makes any queued older one redundant
+SNAPSHOT_MESSAGES = frozenset({'metrics_update', 'connections_update'})
 
 class WebSocketServer:
+    # Client command -> handler method name
+    COMMANDS = {
+        'block_ip': 'handle_block_ip',
+        'unblock_ip': 'handle_unblock_ip',
+        'block_inbound': 'handle_block_inbound',
+        'block_outbound': 'handle_block_outbound',
+        'unblock_inbound': 'handle_unblock_inbound',
+        'unblock_outbound': 'handle_unblock_outbound',
+        'get_connection_details': 'handle_connection_details',
+        'export_data': 'handle_export_data'
+    }
+
     def __init__(self, monitor, console):
         self.monitor = monitor
         self.console = console
         self.clients: Set[websockets.WebSocketServerProtocol] = set()
         self.output_dir = Path(Config.BASE_DIR) / "data"
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.running = False
-
-    async def start(self):
-        """Start the WebSocket server with metric broadcasting"""
-        try:
-            self.running = True
-            
-            # Start metric and connection broadcasting tasks
-            broadcast_task = asyncio.create_task(self.start_metric_broadcast())
-            connection_task = asyncio.create_task(self.start_connection_broadcast())
-            
-            async with websockets.serve(
-                self.handle_client,
-                host='localhost',
-                port=8765,
-                ping_interval=20,
-                ping_timeout=60,  # Increased timeout
-                max_size=2**23,
-                compression=None  # Disable compression to reduce complexity
-            ) as server:
-                logger.info(f"WebSocket server started on ws://localhost:8765")
-                
-                while self.running:
-                    try:
-                        await asyncio.sleep(1)
-                    except asyncio.CancelledError:
-                        logger.info("Server shutdown initiated")
-                        self.running = False
-                        break
-            
-        except Exception as e:
-            logger.error(f"Server error: {e}")
-            self.running = False
-            raise
-        finally:
-            # Cleanup tasks
-            if 'broadcast_task' in locals():
-                broadcast_task.cancel()
-            if 'connection_task' in locals():
-                connection_task.cancel()
-            
-            # Close all client connections
-            for client in self.clients.copy():
-                await client.close()
-            self.clients.clear()
+        self.client_queues: Dict[websockets.WebSocketServerProtocol, asyncio.Queue] = {}
+        self.client_writers: Dict[websockets.WebSocketServerProtocol, asyncio.Task] = {}
+        self.client_queue_size = 32
+        self.send_buffer_size = 1 << 20  # bytes
+        # Connection key -> (endpoint, row) from the previous connections broadcast
+        self.connection_rows: Dict[str, Tuple[NetworkEndpoint, Dict]] = {}
+        # Set when a client joins, so it gets the table without waiting for a change
+        self.connections_stale = True
+        self.last_alert_marker: Optional[Tuple[int, int]] = None
+        # Set while at least one client is connected; broadcasters sleep on it
+        self.clients_connected = asyncio.Event()
+        
+        # Statistics and timestamp shared by everything sent in the same tick
+        self.tick_state: Optional[Tuple[Dict, str]] = None
+        self.tick_time = 0.0
+        self.tick_interval = 1.0  # seconds
 
-    async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
+    async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: Optional[str] = None):
         """Handle client connection and messages"""
+        # Add connection logging
+        client_info = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
         try:
-            # Add connection logging
-            client_info = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
             logger.info(f"New client connected from {client_info}")
             
             await self.register(websocket)
             
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = load_message(message)
                     # Removed path parameter from handle_command call
                     await self.handle_command(websocket, data)
                 except json.JSONDecodeError:
                     logger.error(f"Invalid message format from {client_info}: {message}")
-                    await websocket.send(json.dumps({
+                    await websocket.send(dump_message({
                         'message_type': 'error',
                         'error': 'Invalid message format'
                     }))
                 except Exception as e:
                     logger.error(f"Error handling message from {client_info}: {str(e)}")
-                    await websocket.send(json.dumps({
+                    await websocket.send(dump_message({
                         'message_type': 'error',
                         'error': str(e)
                     }))
@@ -108,11 +105,18 @@ class WebSocketServer:
 
     async def register(self, websocket: websockets.WebSocketServerProtocol):
         """Register a new client connection"""
+        # Broadcasts are queued per client and sent by that client's own writer
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.client_queue_size)
+        self.client_queues[websocket] = queue
+        self.client_writers[websocket] = asyncio.create_task(self.write_client(websocket, queue))
+        self.tune_socket(websocket)
         self.clients.add(websocket)
+        self.clients_connected.set()
+        self.connections_stale = True
         logger.info(f"Client registered. Total clients: {len(self.clients)}")
         
         # Send welcome message
-        await websocket.send(json.dumps({
+        await websocket.send(dump_message({
             'message_type': 'welcome',
             'data': {
                 'timestamp': datetime.now().isoformat(),
@@ -120,33 +124,97 @@ class WebSocketServer:
             }
         }))
 
+    def tune_socket(self, websocket: websockets.WebSocketServerProtocol):
+        """Disable Nagle and enlarge the send buffer for a client socket"""
+        transport = getattr(websocket, 'transport', None)
+        sock = transport.get_extra_info('socket') if transport else None
+        if sock is None:
+            return
+        try:
+            # asyncio and uvloop already set TCP_NODELAY; this covers other loops
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+        except OSError as e:
+            logger.debug(f"Could not tune client socket: {e}")
+
     async def unregister(self, websocket: websockets.WebSocketServerProtocol):
         """Unregister a client connection"""
-        self.clients.remove(websocket)
-        # Clean up any metric streaming tasks
-        if websocket in self.metric_tasks:
-            self.metric_tasks[websocket].cancel()
-            del self.metric_tasks[websocket]
-        logger.info(f"Client disconnected. Total clients: {len(self.clients)}")
-
-    async def broadcast(self, message: Dict[str, Any]):
+        # Safe to call twice: a failed writer and the client handler both unregister
+        registered = websocket in self.clients
+        self.clients.discard(websocket)
+        if not self.clients:
+            self.clients_connected.clear()
+        self.client_queues.pop(websocket, None)
+        # Stop the client's writer
+        writer = self.client_writers.pop(websocket, None)
+        if writer:
+            writer.cancel()
+        if registered:
+            logger.info(f"Client disconnected. Total clients: {len(self.clients)}")
+
+    async def write_client(self, websocket: websockets.WebSocketServerProtocol, queue: asyncio.Queue):
+        """Send queued broadcasts to one client"""
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                    
+                # Only the newest of each periodic snapshot is worth sending
+                latest = {
+                    message_type: index for index, (message_type, _) in enumerate(batch)
+                    if message_type in SNAPSHOT_MESSAGES
+                }
+                for index, (message_type, payload) in enumerate(batch):
+                    if latest.get(message_type, index) == index:
+                        await websocket.send(payload)
+        except websockets.ConnectionClosed:
+            # The client handler unregisters the connection
+            pass
+        except Exception as e:
+            logger.error(f"Error sending to client: {e}")
+            # Without its writer the client would silently stop receiving updates,
+            # so drop it (this task is already ending) and close the connection
+            self.client_writers.pop(websocket, None)
+            await self.unregister(websocket)
+            await websocket.close()
+
+    async def broadcast(self, message: Union[Dict[str, Any], str]):
         """Broadcast message to all connected clients"""
         if self.clients:
-            disconnected = set()
-            message_str = json.dumps(message)
+            # Serialized once for every client; already-encoded payloads pass through.
+            # Payloads stay str so they go out as text frames, which the UI JSON.parses
+            if isinstance(message, str):
+                message_type, message_str = None, message
+            else:
+                message_type, message_str = message.get('message_type'), dump_message(message)
             
-            for client in self.clients:
-                try:
-                    await client.send(message_str)
-                except websockets.ConnectionClosed:
-                    disconnected.add(client)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to client: {e}")
-                    disconnected.add(client)
-                    
-            # Remove disconnected clients
-            for client in disconnected:
-                await self.unregister(client)
+            # Queue for every client without waiting; a client that falls behind
+            # loses its oldest pending snapshot rather than growing without bound
+            for queue in self.client_queues.values():
+                if queue.full():
+                    self.drop_oldest_snapshot(queue)
+                queue.put_nowait((message_type, message_str))
+
+    def drop_oldest_snapshot(self, queue: asyncio.Queue):
+        """Make room in a full client queue, keeping one-shot events when possible"""
+        pending = [queue.get_nowait() for _ in range(queue.qsize())]
+        for index, (message_type, _) in enumerate(pending):
+            if message_type in SNAPSHOT_MESSAGES:
+                del pending[index]
+                break
+        else:
+            del pending[0]
+        for item in pending:
+            queue.put_nowait(item)
+
+    def get_tick_state(self) -> Tuple[Dict, str]:
+        """Monitor statistics and ISO timestamp for the current broadcast tick"""
+        now = time.monotonic()
+        if self.tick_state is None or now - self.tick_time >= self.tick_interval:
+            self.tick_state = (self.monitor.get_statistics(), datetime.now().isoformat())
+            self.tick_time = now
+        return self.tick_state
 
     async def send_initial_state(self, websocket: websockets.WebSocketServerProtocol):
         """Send initial state to new client"""
@@ -158,19 +226,20 @@ class WebSocketServer:
             }
             
             metrics = await self.gather_metrics()
+            statistics, _ = self.get_tick_state()
             
             initial_state = {
                 'message_type': 'initial_state',
                 'data': {
                     'active_connections': connections,
                     'blocked_ips': list(self.monitor.blocked_ips),
-                    'statistics': self.monitor.get_statistics(),
+                    'statistics': statistics,
                     'metrics': metrics,
-                    'alerts': self.monitor.alerts[-10:]  # Last 10 alerts
+                    'alerts': list(self.monitor.recent_alerts)  # Last 10 alerts
                 }
             }
             
-            await websocket.send(json.dumps(initial_state))
+            await websocket.send(dump_message(initial_state))
             
         except Exception as e:
             logger.error(f"Error sending initial state: {e}")
@@ -178,37 +247,33 @@ class WebSocketServer:
     async def gather_metrics(self) -> Dict:
         """Gather real-time system metrics"""
         try:
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent(interval=None)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            network_io = psutil.net_io_counters()
-            
-            # Get monitor statistics
-            stats = self.monitor.get_statistics()
+            # Get monitor statistics; system metrics come from the monitor's
+            # background sampler, so psutil is not queried on the event loop
+            stats, timestamp = self.get_tick_state()
+            system = stats.get('system', {})
             
             return {
                 'system': {
                     'cpu': {
-                        'percent': cpu_percent,
+                        'percent': system.get('cpu_percent', 0),
                         'cores': psutil.cpu_count(),
-                        'frequency': psutil.cpu_freq().current if psutil.cpu_freq() else 0
+                        'frequency': system.get('cpu_frequency', 0)
                     },
                     'memory': {
-                        'total': memory.total,
-                        'used': memory.used,
-                        'percent': memory.percent
+                        'total': system.get('memory_total', 0),
+                        'used': system.get('memory_used', 0),
+                        'percent': system.get('memory_percent', 0)
                     },
                     'disk': {
-                        'total': disk.total,
-                        'used': disk.used,
-                        'percent': disk.percent
+                        'total': system.get('disk_total', 0),
+                        'used': system.get('disk_used', 0),
+                        'percent': system.get('disk_percent', 0)
                     },
                     'network': {
-                        'bytes_sent': network_io.bytes_sent,
-                        'bytes_recv': network_io.bytes_recv,
-                        'packets_sent': network_io.packets_sent,
-                        'packets_recv': network_io.packets_recv
+                        'bytes_sent': system.get('network_bytes_sent', 0),
+                        'bytes_recv': system.get('network_bytes_recv', 0),
+                        'packets_sent': system.get('network_packets_sent', 0),
+                        'packets_recv': system.get('network_packets_recv', 0)
                     }
                 },
                 'monitoring': {
@@ -223,7 +288,7 @@ class WebSocketServer:
                     'safe_connections': stats['connections']['safe'],
                     'recent_alerts': stats['security']['recent_alerts']
                 },
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
             
         except Exception as e:
@@ -273,22 +338,23 @@ class WebSocketServer:
         """Broadcast metrics to all clients periodically"""
         while True:
             try:
+                # Nothing is gathered while no dashboard is connected
+                await self.clients_connected.wait()
                 if self.clients:
-                    # Get real-time system metrics
-                    cpu_percent = psutil.cpu_percent(interval=0.1)
-                    memory = psutil.virtual_memory()
-                    net_io = psutil.net_io_counters()
-                    connections = self.monitor.get_statistics()
+                    # System metrics come from the monitor's background sampler,
+                    # so nothing here blocks the event loop
+                    connections, timestamp = self.get_tick_state()
+                    system = connections.get('system', {})
 
                     metrics_data = {
                         'message_type': 'metrics_update',
                         'data': {
                             'system': {
-                                'cpu': cpu_percent,
-                                'memory': memory.percent,
+                                'cpu': system.get('cpu_percent', 0),
+                                'memory': system.get('memory_percent', 0),
                                 'network': {
-                                    'bytes_sent': net_io.bytes_sent,
-                                    'bytes_recv': net_io.bytes_recv
+                                    'bytes_sent': system.get('network_bytes_sent', 0),
+                                    'bytes_recv': system.get('network_bytes_recv', 0)
                                 }
                             },
                             'connections': {
@@ -301,7 +367,7 @@ class WebSocketServer:
                                 'bytes_monitored': connections.get('traffic', {}).get('total_bytes_monitored', 0)
                             }
                         },
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': timestamp
                     }
 
                     await self.broadcast(metrics_data)
@@ -313,40 +379,68 @@ class WebSocketServer:
                 logger.error(f"Error in metric broadcast: {e}")
                 await asyncio.sleep(5)
 
+    def connection_row(self, conn: NetworkEndpoint) -> Dict:
+        """Summarize an endpoint for the connections table"""
+        return {
+            'host': conn.host,
+            'port': conn.port,
+            'protocol': conn.protocol,
+            'process': conn.process_info.name if conn.process_info else 'Unknown',
+            'status': conn.security_assessment.risk_level if conn.security_assessment else 'UNKNOWN',
+            'bytes_sent': conn.bytes_sent,
+            'bytes_received': conn.bytes_received,
+            'latency': conn.latency,
+            'last_seen': conn.last_seen.isoformat() if conn.last_seen else None
+        }
+
     async def start_connection_broadcast(self):
         """Broadcast connection updates to all clients periodically"""
         while True:
             try:
+                # Nothing is gathered while no dashboard is connected
+                await self.clients_connected.wait()
                 if self.clients:
-                    active_connections = []
-                    for conn in self.monitor.active_connections.values():
+                    _, timestamp = self.get_tick_state()
+                    # The monitor replaces an endpoint object whenever it rescans it,
+                    # so a row built for the same object is still current.
+                    # Rows are updated in place to avoid rebuilding the cache every tick
+                    rows = self.connection_rows
+                    active = self.monitor.active_connections
+                    changed = self.connections_stale
+                    for key, conn in active.items():
+                        cached = rows.get(key)
+                        if cached is not None and cached[0] is conn:
+                            continue
                         try:
-                            connection_data = {
-                                'host': conn.host,
-                                'port': conn.port,
-                                'protocol': conn.protocol,
-                                'process': conn.process_info.name if conn.process_info else 'Unknown',
-                                'status': conn.security_assessment.risk_level if conn.security_assessment else 'UNKNOWN',
-                                'bytes_sent': conn.bytes_sent,
-                                'bytes_received': conn.bytes_received,
-                                'latency': conn.latency if hasattr(conn, 'latency') else 0,
-                                'last_seen': conn.last_seen.isoformat() if conn.last_seen else None
-                            }
-                            active_connections.append(connection_data)
+                            rows[key] = (conn, self.connection_row(conn))
+                            changed = True
                         except Exception as e:
                             logger.error(f"Error processing connection data: {e}")
 
-                    connection_update = {
-                        'message_type': 'connections_update',
-                        'data': {
-                            'active_connections': active_connections,
-                            'statistics': self.monitor.get_statistics(),
-                            'alerts': [alert for alert in self.monitor.alerts[-5:]]  # Last 5 alerts
-                        },
-                        'timestamp': datetime.now().isoformat()
-                    }
+                    # Drop rows for connections that are no longer active
+                    stale = rows.keys() - active.keys()
+                    if stale:
+                        for key in stale:
+                            del rows[key]
+                        changed = True
 
-                    await self.broadcast(connection_update)
+                    # Clients keep the last table, so an unchanged one is not resent
+                    alert_marker = (self.monitor.alert_count, len(self.monitor.alerts))
+                    if changed or alert_marker != self.last_alert_marker:
+                        self.connections_stale = False
+                        self.last_alert_marker = alert_marker
+                        active_connections = [row for _, row in rows.values()]
+                        # Statistics travel in metrics_update only
+                        connection_update = {
+                            'message_type': 'connections_update',
+                            'data': {
+                                'active_connections': active_connections,
+                                'alerts': list(self.monitor.recent_alerts)[-5:]  # Last 5 alerts
+                            },
+                            'timestamp': timestamp
+                        }
+
+                        await self.broadcast(connection_update)
 
                 await asyncio.sleep(1)  # Update every second
             except asyncio.CancelledError:
@@ -355,56 +449,24 @@ class WebSocketServer:
                 logger.error(f"Error in connection broadcast: {e}")
                 await asyncio.sleep(5)
 
-    async def handle_client(self, websocket: websockets.WebSocketServerProtocol):
-        """Handle client connection and messages"""
-        try:
-            await self.register(websocket)
-            
-            async for message in websocket:
-                try:
-                    data = json.loads(message)
-                    await self.handle_command(websocket, path, data)
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid message format: {message}")
-                except Exception as e:
-                    logger.error(f"Error handling message: {e}")
-                    
-        except websockets.exceptions.ConnectionClosed:
-            logger.info("Client connection closed normally")
-        except Exception as e:
-            logger.error(f"Error in client handler: {e}")
-        finally:
-            await self.unregister(websocket)
-
     async def handle_command(self, websocket: websockets.WebSocketServerProtocol, data: Dict):
         """Handle client commands"""
         try:
             command = data.get('command')
             params = data.get('params', {})
             
-            commands = {
-                'block_ip': self.handle_block_ip,
-                'unblock_ip': self.handle_unblock_ip,
-                'block_inbound': self.handle_block_inbound,
-                'block_outbound': self.handle_block_outbound,
-                'unblock_inbound': self.handle_unblock_inbound,
-                'unblock_outbound': self.handle_unblock_outbound,
-                'get_connection_details': self.handle_connection_details,
-                'export_data': self.handle_export_data
-            }
-            
-            handler = commands.get(command)
-            if handler:
-                await handler(websocket, params)
+            handler_name = self.COMMANDS.get(command)
+            if handler_name:
+                await getattr(self, handler_name)(websocket, params)
             else:
-                await websocket.send(json.dumps({
+                await websocket.send(dump_message({
                     'message_type': 'error',
                     'error': f'Unknown command: {command}'
                 }))
                 
         except Exception as e:
             logger.error(f"Error handling command: {str(e)}")
-            await websocket.send(json.dumps({
+            await websocket.send(dump_message({
                 'message_type': 'error',
                 'error': str(e)
             }))
@@ -413,12 +475,22 @@ class WebSocketServer:
         """Handle IP blocking command"""
         host = params.get('host')
         if host:
-            self.monitor.block_ip(host)
+            await self.monitor.block_ip(host)
             await self.broadcast({
                 'message_type': 'ip_blocked',
                 'data': {'host': host}
             })
 
+    async def handle_unblock_ip(self, websocket: websockets.WebSocketServerProtocol, params: Dict):
+        """Handle IP unblocking command"""
+        host = params.get('host')
+        if host:
+            await self.monitor.unblock_ip(host)
+            await self.broadcast({
+                'message_type': 'ip_unblocked',
+                'data': {'host': host}
+            })
+
     async def handle_block_inbound(self, websocket: websockets.WebSocketServerProtocol, params: Dict):
         """Handle inbound traffic blocking command"""
         self.monitor.block_all_inbound()
@@ -457,7 +529,7 @@ class WebSocketServer:
         port = params.get('port')
         if host and port:
             details = self.monitor.get_connection_details(host, port)
-            await websocket.send(json.dumps({
+            await websocket.send(dump_message({
                 'message_type': 'connection_details',
                 'data': details
             }))
@@ -467,7 +539,7 @@ class WebSocketServer:
         export_type = params.get('type', 'all')
         format_type = params.get('format', 'json')
         result = await self.monitor.export_data(export_type, format_type)
-        await websocket.send(json.dumps({
+        await websocket.send(dump_message({
             'message_type': 'export_complete',
             'data': result
         }))
\ No newline at end of file
@@ -24,7 +24,7 @@ class ProcessInfo:
         return {k: str(v) if isinstance(v, datetime) else v 
                 for k, v in asdict(self).items() if v is not None}
 
-@dataclass
+@dataclass(slots=True)
 class TrafficSample:
     """Network traffic sample data"""
     timestamp: datetime
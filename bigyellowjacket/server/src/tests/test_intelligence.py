@@ -0,0 +1,133 @@
+import ipaddress
+import unittest
+from unittest import mock
+
+from src.analyzers.intelligence import NetworkIntelligenceGatherer
+
+# Blocks whose stdlib is_private flag changed between Python patch releases
+# (192.0.0.0/24 was widened, with 192.0.0.9 and 192.0.0.10 carved out)
+UNSTABLE_PRIVATE_BLOCK = ipaddress.IPv4Network('192.0.0.0/24')
+
+MALICIOUS_FEED = [
+    '198.51.100.7',
+    '203.0.113.0/24',
+    '45.33.0.0/24',
+    '45.33.1.0/24',    # adjacent to the block above, merged into one range
+    '45.33.0.128/25',  # nested inside an earlier block
+    '10.0.0.0/30',
+    '8.8.8.8/32',
+    '2001:db8::1',
+    'not-an-ip'        # malformed entries must not break range building
+]
+
+def make_gatherer(malicious_ips=()):
+    """Build a gatherer without touching the on-disk threat database"""
+    threat_intel = {
+        'malicious_ips': set(malicious_ips),
+        'threat_patterns': [],
+        'risk_scores': {},
+        'known_threats': {}
+    }
+    with mock.patch.object(NetworkIntelligenceGatherer, 'load_threat_intel',
+                           return_value=threat_intel):
+        return NetworkIntelligenceGatherer(console_monitor=None)
+
+def boundary_addresses(ranges):
+    """First and last address of each (first, last) range, plus their neighbours"""
+    addresses = set()
+    for first, last in ranges:
+        for value in (first - 1, first, first + 1, last - 1, last, last + 1):
+            if 0 <= value <= 0xFFFFFFFF:
+                addresses.add(str(ipaddress.IPv4Address(value)))
+    return sorted(addresses, key=lambda ip: int(ipaddress.IPv4Address(ip)))
+
+def network_bounds(networks):
+    return [(int(n.network_address), int(n.broadcast_address)) for n in networks]
+
+def stdlib_is_private(ip: str) -> bool:
+    """The ipaddress flags is_private_ip replaced"""
+    ip_obj = ipaddress.ip_address(ip)
+    return (ip_obj.is_private or ip_obj.is_loopback or
+            ip_obj.is_link_local or ip_obj.is_multicast)
+
+class TestIsPrivateIp(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.gatherer = make_gatherer()
+
+    def test_matches_ipaddress_at_range_boundaries(self):
+        ranges = list(zip(self.gatherer.private_range_starts, self.gatherer.private_range_ends))
+        ranges += network_bounds(ipaddress.IPv4Network(block) for block in (
+            '0.0.0.0/8', '10.0.0.0/8', '100.64.0.0/10', '127.0.0.0/8',
+            '169.254.0.0/16', '172.16.0.0/12', '192.168.0.0/16', '198.18.0.0/15',
+            '224.0.0.0/4', '240.0.0.0/4'
+        ))
+        for ip in boundary_addresses(ranges):
+            if ipaddress.IPv4Address(ip) in UNSTABLE_PRIVATE_BLOCK:
+                continue
+            with self.subTest(ip=ip):
+                self.assertEqual(self.gatherer.is_private_ip(ip), stdlib_is_private(ip))
+
+    def test_special_purpose_block_edges(self):
+        # Private under every Python release
+        for ip in ('192.0.0.0', '192.0.0.7', '192.0.0.170', '192.0.0.171'):
+            with self.subTest(ip=ip):
+                self.assertTrue(self.gatherer.is_private_ip(ip))
+        # Globally reachable
+        for ip in ('192.0.0.9', '192.0.0.10', '191.255.255.255', '192.0.1.0'):
+            with self.subTest(ip=ip):
+                self.assertFalse(self.gatherer.is_private_ip(ip))
+
+    def test_extreme_addresses(self):
+        for ip in ('0.0.0.0', '255.255.255.255', '255.255.255.254', '1.1.1.1'):
+            with self.subTest(ip=ip):
+                self.assertEqual(self.gatherer.is_private_ip(ip), stdlib_is_private(ip))
+
+    def test_ipv6_falls_back_to_ipaddress(self):
+        for ip in ('::1', 'fe80::1', 'fc00::1', 'fd12:3456::1', 'ff02::1',
+                   '2001:db8::1', '2606:4700::1111'):
+            with self.subTest(ip=ip):
+                self.assertEqual(self.gatherer.is_private_ip(ip), stdlib_is_private(ip))
+
+    def test_invalid_address(self):
+        self.assertFalse(self.gatherer.is_private_ip('not-an-ip'))
+        self.assertFalse(self.gatherer.is_private_ip('256.1.1.1'))
+
+class TestIsMaliciousIp(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.gatherer = make_gatherer(MALICIOUS_FEED)
+        cls.networks = []
+        for entry in MALICIOUS_FEED:
+            try:
+                cls.networks.append(ipaddress.IPv4Network(entry, strict=False))
+            except ValueError:
+                pass
+
+    def expected(self, ip: str) -> bool:
+        address = ipaddress.IPv4Address(ip)
+        return any(address in network for network in self.networks)
+
+    def test_matches_ipaddress_at_feed_boundaries(self):
+        for ip in boundary_addresses(network_bounds(self.networks)):
+            with self.subTest(ip=ip):
+                self.assertEqual(self.gatherer.is_malicious_ip(ip), self.expected(ip))
+
+    def test_adjacent_blocks_are_merged(self):
+        self.assertEqual(len(self.gatherer.malicious_range_starts), 5)
+        self.assertTrue(self.gatherer.is_malicious_ip('45.33.0.255'))
+        self.assertTrue(self.gatherer.is_malicious_ip('45.33.1.0'))
+        self.assertFalse(self.gatherer.is_malicious_ip('45.33.2.0'))
+
+    def test_non_ipv4_entries_match_exactly(self):
+        self.assertTrue(self.gatherer.is_malicious_ip('2001:db8::1'))
+        self.assertFalse(self.gatherer.is_malicious_ip('2001:db8::2'))
+        self.assertFalse(self.gatherer.is_malicious_ip('also-not-an-ip'))
+
+    def test_empty_feed(self):
+        gatherer = make_gatherer()
+        self.assertFalse(gatherer.is_malicious_ip('203.0.113.1'))
+        self.assertFalse(gatherer.is_malicious_ip('0.0.0.0'))
+
+if __name__ == '__main__':
+    unittest.main()
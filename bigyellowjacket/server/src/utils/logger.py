@@ -1,5 +1,9 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
 from colorama import Fore, Back, Style, init
 from config.settings import Config
@@ -27,6 +31,70 @@ class ColoredFormatter(logging.Formatter):
             
         return super().format(record)
 
+class RepeatFilter(logging.Filter):
+    """Collapse identical records logged within a short window"""
+    def __init__(self, window: float = 1.0, max_tracked: int = 1000):
+        super().__init__()
+        self.window = window
+        self.max_tracked = max_tracked
+        self.last_emitted = {}
+        self.suppressed = {}
+        # Latest dropped record per key, reused for its summary line
+        self.suppressed_records = {}
+        self.lock = threading.Lock()
+        self.flush_timer = None
+
+    def filter(self, record):
+        if getattr(record, 'repeat_summary', False):
+            return True
+        key = (record.levelno, record.msg)
+        with self.lock:
+            last = self.last_emitted.get(key)
+            if last is not None and record.created - last < self.window:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                self.suppressed_records[key] = record
+                # Report the count once the window closes, even if nothing follows
+                if self.flush_timer is None:
+                    self.flush_timer = threading.Timer(self.window, self.flush)
+                    self.flush_timer.daemon = True
+                    self.flush_timer.start()
+                return False
+
+            # A record arriving before the flush reports the count itself
+            suppressed = self.suppressed.pop(key, 0)
+            self.suppressed_records.pop(key, None)
+            if suppressed:
+                record.msg = f"{record.msg} (repeated {suppressed} more times)"
+            self.last_emitted[key] = record.created
+
+            # Messages embed hosts and errors, so forget keys outside the window
+            if len(self.last_emitted) > self.max_tracked:
+                cutoff = record.created - self.window
+                self.last_emitted = {k: t for k, t in self.last_emitted.items()
+                                     if t >= cutoff or k in self.suppressed}
+        return True
+
+    def flush(self, force: bool = False):
+        """Emit a summary for every key whose window has closed"""
+        now = time.time()
+        with self.lock:
+            self.flush_timer = None
+            summaries = []
+            for key, count in list(self.suppressed.items()):
+                if force or now - self.last_emitted.get(key, 0) >= self.window:
+                    record = self.suppressed_records.pop(key)
+                    del self.suppressed[key]
+                    record.msg = f"{record.msg} (repeated {count} more times)"
+                    record.repeat_summary = True
+                    summaries.append(record)
+            if self.suppressed and not force:
+                self.flush_timer = threading.Timer(self.window, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+        for record in summaries:
+            logging.getLogger(record.name).handle(record)
+
 def setup_logger(name: str = "BigYellowJacket"):
     """Setup application logger with console and file handlers"""
     logger = logging.getLogger(name)
@@ -42,7 +110,6 @@ def setup_logger(name: str = "BigYellowJacket"):
         '%(asctime)s %(color)s[%(levelname)s]%(reset)s %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
-    logger.addHandler(console_handler)
 
     # File handler with rotation
     log_file = Path(Config.LOGGING.FILE)
@@ -57,7 +124,19 @@ def setup_logger(name: str = "BigYellowJacket"):
         '%(asctime)s [%(levelname)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
-    logger.addHandler(file_handler)
+
+    # Hand records to a background thread so console and file writes never
+    # block the event loop
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
+    # Repeats are dropped before they are formatted or queued; pending counts
+    # are reported at exit, before the listener stops
+    repeat_filter = RepeatFilter()
+    logger.addFilter(repeat_filter)
+    atexit.register(repeat_filter.flush, True)
 
     return logger
 
@@ -85,8 +85,9 @@ def setup_threat_intel():
     for filename, content in files_to_create.items():
         file_path = base_dir / filename
         if isinstance(content, (dict, list)):
+            # Written compact; the files are machine-read at startup
             with open(file_path, 'w') as f:
-                json.dump(content, f, indent=2)
+                json.dump(content, f, separators=(',', ':'))
             print(f"Created {file_path}")
         else:
             with open(file_path, 'w') as f: